@@ -0,0 +1,255 @@
+# nback_benchmark.py
+"""Timing-accuracy benchmark for the machine it runs on.
+
+    python nback_benchmark.py [--samples 30] [--scale 1.0] [--out results.json]
+
+Opens a fullscreen window like the experiment and measures, in order:
+
+- after_500 / after_1500: how late root.after() fires for the stimulus and
+  ITI delays (ms past the requested delay)
+- paint: stimulus label config() plus update_idletasks(), i.e. the Tk
+  layout and redraw work before a stimulus is on screen
+- paint_glyphs: the same for the experiment's pre-rendered GlyphRenderer
+- key_dispatch: from queueing a space key event to its bound handler running
+- frame_switch / frame_switch_pack: switching between nine screens with the
+  experiment's FrameStack, and with the old unpack-everything method,
+  including the resulting layout
+- session_error / session_drift: scheduling error of every event of a full
+  EXPERIMENT_TRIALS x N_LEVELS session run by the real TrialSession and
+  DeadlineScheduler (with simulated presses), and the error of its last event
+  (--scale shortens every duration, e.g. 0.1 for a ten times faster run)
+
+Results are percentile summaries with histograms, written as JSON (by
+default to ~/.nback/benchmarks/) so stations can be compared and
+regressions caught.
+"""
+import argparse
+import json
+import platform
+import socket
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+
+from nback_core.config import (STIMULUS_DURATION, ITI_DURATION, BLOCK_BANNER_DURATION,
+                               LETTERS)
+from nback_core.manifest import generate_version
+from nback_core.session import TrialSession
+from nback_core.stats import summarize
+from nback_core.store import TrialStore
+from nback_core.timing import SessionClock, DeadlineScheduler
+from nback_glyphs import GlyphRenderer, DOT
+from nback_frames import benchmark_switch
+
+BENCHMARK_DIR = Path.home() / ".nback" / "benchmarks"
+BENCHMARK_FORMAT = 1
+
+
+class LabelDisplay:
+    """TrialSession display on a single label, drawn like the experiment's"""
+
+    def __init__(self, root, label):
+        self.root = root
+        self.label = label
+
+    def show_banner(self, text):
+        self.label.config(font=("Helvetica", 144, "bold"), text=text, fg="white")
+        self.root.update_idletasks()
+
+    def show_stimulus(self, letter):
+        self.label.config(font=("Helvetica", 144, "bold"), text=str(letter), fg="white")
+        self.root.update_idletasks()
+
+    def show_fixation(self):
+        self.label.config(font=("Helvetica", 48, "bold"), text="•", fg="white")
+        self.root.update_idletasks()
+
+
+class TimingBenchmark:
+    """Runs the measurements one after another on the Tk event loop"""
+
+    def __init__(self, root, label, samples=30, scale=1.0, renderer=None):
+        self.root = root
+        self.label = label
+        self.renderer = renderer
+        self.samples = samples
+        self.scale = scale
+        self.clock = SessionClock()
+        self.results = {}
+        self._steps = [
+            ("after_500", lambda done: self.measure_after(
+                "after_500", int(STIMULUS_DURATION * 1000), done)),
+            ("after_1500", lambda done: self.measure_after(
+                "after_1500", int(ITI_DURATION * 1000), done)),
+            ("paint", self.measure_paint),
+            ("key_dispatch", self.measure_key_dispatch),
+            ("frame_switch", self.measure_frame_switch),
+            ("session", self.measure_session),
+        ]
+
+    def run(self, on_done):
+        """Run every measurement, then call on_done(results)"""
+        def next_step():
+            if self._steps:
+                name, step = self._steps.pop(0)
+                print(f"Measuring {name}...")
+                step(lambda: self.root.after(100, next_step))
+            else:
+                on_done(self.results)
+        next_step()
+
+    def measure_after(self, name, delay_ms, done):
+        lateness = []
+
+        def fire(requested_ns):
+            lateness.append((self.clock.now() - requested_ns) / 1_000_000 - delay_ms)
+            if len(lateness) < self.samples:
+                schedule()
+            else:
+                self.results[name] = summarize(lateness)
+                done()
+
+        def schedule():
+            requested_ns = self.clock.now()
+            self.root.after(delay_ms, lambda: fire(requested_ns))
+
+        schedule()
+
+    def measure_paint(self, done):
+        times = []
+        for i in range(self.samples * 10):
+            # Alternate letter and dot, as stimulus onsets and offsets do
+            start = self.clock.now()
+            if i % 2:
+                self.label.config(font=("Helvetica", 48, "bold"), text="•", fg="white")
+            else:
+                self.label.config(font=("Helvetica", 144, "bold"),
+                                  text=LETTERS[i // 2 % len(LETTERS)], fg="white")
+            self.root.update_idletasks()
+            times.append((self.clock.now() - start) / 1_000_000)
+        self.results["paint"] = summarize(times)
+
+        if self.renderer is not None:
+            times = []
+            self.renderer.warm_up()
+            for i in range(self.samples * 10):
+                start = self.clock.now()
+                self.renderer.show(DOT if i % 2 else LETTERS[i // 2 % len(LETTERS)])
+                self.root.update_idletasks()
+                times.append((self.clock.now() - start) / 1_000_000)
+            self.renderer.clear()
+            self.results["paint_glyphs"] = summarize(times)
+        done()
+
+    def measure_key_dispatch(self, done):
+        latencies = []
+        sent = {}
+
+        def on_key(event):
+            latencies.append((self.clock.now() - sent['ns']) / 1_000_000)
+            if len(latencies) < self.samples * 10:
+                self.root.after(10, send)
+            else:
+                self.root.unbind('<Key>')
+                self.results["key_dispatch"] = summarize(latencies)
+                done()
+
+        def send():
+            sent['ns'] = self.clock.now()
+            self.root.event_generate('<Key>', keysym='space', when='tail')
+
+        self.root.focus_force()
+        self.root.bind('<Key>', on_key)
+        send()
+
+    def measure_frame_switch(self, done):
+        times = benchmark_switch(self.root, switches=self.samples * 10)
+        self.results["frame_switch"] = summarize(times["stack"])
+        self.results["frame_switch_pack"] = summarize(times["pack"])
+        done()
+
+    def measure_session(self, done):
+        blocks = generate_version(1)
+        scheduler = DeadlineScheduler(self.root, self.clock)
+        store = TrialStore('benchmark', 1, LETTERS)
+        press_delay_ms = int(STIMULUS_DURATION * 1000 * self.scale / 2)
+
+        def on_onset(block, trial, onset_ns):
+            if trial['is_target']:
+                self.root.after(press_delay_ms, lambda: self.root.event_generate(
+                    '<Key>', keysym='space', when='tail'))
+
+        def on_finish():
+            self.root.unbind('<Key>')
+            errors = [error_ns / 1_000_000 for _, _, _, error_ns in scheduler.log]
+            self.results["session_error"] = summarize(errors)
+            self.results["session_drift"] = {"last_event_error_ms": errors[-1],
+                                             "trials": len(store)}
+            done()
+
+        session = TrialSession(blocks, self.clock, scheduler, LabelDisplay(self.root, self.label),
+                               store, banner_ms=BLOCK_BANNER_DURATION * 1000 * self.scale,
+                               stimulus_ms=STIMULUS_DURATION * 1000 * self.scale,
+                               iti_ms=ITI_DURATION * 1000 * self.scale,
+                               on_finish=on_finish, on_onset=on_onset)
+        self.root.bind('<Key>', lambda event: session.press(self.clock.now()))
+        session.start()
+
+
+def machine_info(root):
+    return {
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "tk": root.tk.call('info', 'patchlevel'),
+        "screen": f"{root.winfo_screenwidth()}x{root.winfo_screenheight()}",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure n-back timing accuracy on this machine")
+    parser.add_argument('--samples', type=int, default=30,
+                        help="root.after samples per delay (x10 for paint and key dispatch)")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="scale factor for the session's durations")
+    parser.add_argument('--out', default=None, help="JSON output file")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.title("N-Back Timing Benchmark")
+    root.attributes('-fullscreen', True)
+    root.configure(bg="#2d2d2d")
+    label = tk.Label(root, text="", font=("Helvetica", 144, "bold"), fg="white", bg="#2d2d2d")
+    label.pack(expand=True)
+    renderer = GlyphRenderer(root, LETTERS)
+    renderer.pack(expand=True, fill='x')
+    root.update()
+
+    def finish(results):
+        report = {
+            "format": BENCHMARK_FORMAT,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "machine": machine_info(root),
+            "config": {"samples": args.samples, "scale": args.scale,
+                       "stimulus_ms": STIMULUS_DURATION * 1000, "iti_ms": ITI_DURATION * 1000},
+            "unit": "ms",
+            "metrics": results,
+        }
+        out = Path(args.out) if args.out else (
+            BENCHMARK_DIR / f"timing-{socket.gethostname()}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2))
+        for name, summary in results.items():
+            if "percentiles" in summary:
+                p = summary["percentiles"]
+                print(f"{name:<14} p50 {p['p50']:8.3f}  p99 {p['p99']:8.3f}  max {summary['max']:8.3f} ms")
+        print(f"Results written to {out}")
+        root.destroy()
+
+    TimingBenchmark(root, label, args.samples, args.scale, renderer).run(finish)
+    root.mainloop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+# nback_core/__init__.py
+"""Tk-free core of the n-back experiment.
+
+Sequence generation (manifest, sequences), the trial loop (session, timeline, timing),
+scoring and persistence (store, journal), usable from analysis scripts and
+the headless simulator as well as the GUI. Importing it has no side effects:
+no window, no speech engine, no file access. NumPy is only needed by
+nback_core.sequences, which is not imported here.
+"""
+from .config import (STIMULUS_DURATION, ITI_DURATION, BLOCK_BANNER_DURATION, EXPERIMENT_TRIALS,
+                     TARGET_PERCENTAGE, N_LEVELS, LETTERS, SEEDS, NUM_VERSIONS)
+from .manifest import (seeded_rng, generate_blocks, generate_version, default_params,
+                       SequenceManifest, load_manifest)
+from .session import TrialSession
+from .timeline import Timeline, TimelineEvent, compile_timeline
+from .store import TrialStore, CSV_FIELDS, write_csv, write_block_summaries, export_journal
+from .journal import read_journal, atomic_write
+from .scoring import d_prime, score, score_by_n, BlockStats, SessionStats
+from .stats import RunningStats, Histogram
+from .timing import SessionClock
@@ -0,0 +1,297 @@
+# nback_core/aio.py
+"""asyncio event loop running next to Tk's mainloop.
+
+Tk owns the main thread and every stimulus callback runs there, so I/O done
+on it (roster reloads, saving, uploads, logging) competes with the trial
+loop's root.after() events. AsyncBridge runs an asyncio loop on a background
+thread instead:
+
+    bridge = AsyncBridge(root, busy=lambda: scheduler.due_within(HANDOFF_GUARD_MS))
+    bridge.start()
+    bridge.run(upload(records), on_done=lambda result, error: ...)
+    bridge.run_blocking(roster.refresh, on_done=...)
+
+Coroutines never touch Tk. Their results are queued, and the Tk thread picks
+them up from a root.after() poll that only runs while something is
+outstanding, is skipped while busy() says a scheduled event is close, and
+spends at most slice_ms per poll on on_done handlers, so a completion can
+never push a stimulus event late.
+
+    python -m nback_core.aio --benchmark [--seconds 10]
+
+measures the scheduling error of a DeadlineScheduler event stream with no
+I/O, with the same I/O done inline on the event loop, and through the bridge.
+"""
+import argparse
+import asyncio
+import heapq
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+from .stats import summarize
+from .timing import SessionClock, DeadlineScheduler
+
+POLL_MS = 10  # How often the Tk thread checks for finished coroutines while any are outstanding
+SLICE_MS = 2.0  # Most time one poll spends running on_done handlers
+HANDOFF_GUARD_MS = 10  # Hold handoffs back while a scheduled event is this close
+# Python lets a thread hold the GIL this long before handing it over. Python
+# code on the loop thread (JSON encoding etc.) can make the Tk thread wait that
+# long after a timer wakes it; below SCHEDULER_SPIN_MS the wait is absorbed.
+SWITCH_INTERVAL_S = 0.0005
+
+
+class AsyncBridge:
+    """asyncio loop on a daemon thread, with results handed back to the Tk thread.
+
+    run() and run_blocking() may only be called from the Tk thread; they
+    return a concurrent.futures.Future. on_done(result, error) is called on
+    the Tk thread, with error None on success. Handlers of cancelled work are
+    not called.
+    """
+
+    def __init__(self, root, busy=None, poll_ms=POLL_MS, slice_ms=SLICE_MS,
+                 switch_interval=SWITCH_INTERVAL_S, debug=False):
+        self.root = root
+        self.busy = busy
+        self.poll_ms = poll_ms
+        self.slice_ns = int(slice_ms * 1_000_000)
+        self.switch_interval = switch_interval
+        self.debug = debug
+        self.loop = None
+        self.deferred = 0  # Polls held back because a scheduled event was close
+        self.handled = 0
+        self._thread = None
+        self._done = deque()  # (on_done, future), appended from the loop thread
+        self._outstanding = 0
+        self._poll_id = None
+        self._closed = False
+        self._saved_switch_interval = None
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            try:
+                self.loop.run_forever()
+                tasks = asyncio.all_tasks(self.loop)
+                for task in tasks:
+                    task.cancel()
+                self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+                self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            finally:
+                self.loop.close()
+
+        if self.switch_interval:
+            self._saved_switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self.switch_interval, self._saved_switch_interval))
+        self._thread = threading.Thread(target=run, name="nback-asyncio", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def run(self, coro, on_done=None):
+        """Run a coroutine on the loop thread"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if on_done is not None:
+            self.watch(future, on_done)
+        return future
+
+    def watch(self, future, on_done):
+        """Hand a concurrent.futures.Future completed on any thread (e.g. by a
+        WriteBehind worker) back to the Tk thread through the same guarded poll"""
+        self._outstanding += 1
+        future.add_done_callback(lambda f: self._done.append((on_done, f)))
+        if self._poll_id is None and not self._closed:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+        return future
+
+    def run_blocking(self, fn, *args, on_done=None):
+        """Run a blocking function in the loop's thread pool"""
+        return self.run(asyncio.to_thread(fn, *args), on_done)
+
+    def _poll(self):
+        self._poll_id = None
+        if self._done:
+            if self.busy is not None and self.busy():
+                self.deferred += 1
+            else:
+                end_ns = time.perf_counter_ns() + self.slice_ns
+                while self._done and time.perf_counter_ns() < end_ns:
+                    on_done, future = self._done.popleft()
+                    self._outstanding -= 1
+                    if future.cancelled():
+                        continue
+                    error = future.exception()
+                    try:
+                        on_done(None if error else future.result(), error)
+                    except Exception as e:
+                        if self.debug:
+                            print(f"Background task handler failed: {e}")
+                    self.handled += 1
+        if self._outstanding and self._poll_id is None and not self._closed:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def shutdown(self, timeout=2.0):
+        """Cancel outstanding work and stop the loop; pending handlers are not called"""
+        self._closed = True
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        if self.loop is not None and self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+        if self._saved_switch_interval is not None:
+            sys.setswitchinterval(self._saved_switch_interval)
+            self._saved_switch_interval = None
+
+
+class _TickRoot:
+    """Single-threaded stand-in for Tk's after() loop, for the headless benchmark"""
+
+    def __init__(self):
+        self._heap = []
+        self._idle = deque()
+        self._cancelled = set()
+        self._next_id = 0
+        self._running = False
+
+    def after(self, ms, callback):
+        self._next_id += 1
+        heapq.heappush(self._heap, (time.perf_counter_ns() + int(ms) * 1_000_000,
+                                    self._next_id, callback))
+        return self._next_id
+
+    def after_idle(self, callback):
+        self._idle.append(callback)
+
+    def after_cancel(self, after_id):
+        self._cancelled.add(after_id)
+
+    def quit(self):
+        self._running = False
+
+    def mainloop(self):
+        self._running = True
+        while self._running:
+            while self._idle:
+                self._idle.popleft()()
+            if not self._heap:
+                break
+            due_ns, after_id, callback = self._heap[0]
+            wait_ns = due_ns - time.perf_counter_ns()
+            if wait_ns > 0:
+                time.sleep(wait_ns / 1e9)
+                continue
+            heapq.heappop(self._heap)
+            if after_id in self._cancelled:
+                self._cancelled.discard(after_id)
+            else:
+                callback()
+
+
+def _write_records(path, storage_ms, records=200):
+    """Typical background write: serialize records, append them and fsync.
+
+    storage_ms of extra blocking stands in for a slow (e.g. network-mounted) disk.
+    """
+    lines = ''.join(json.dumps({"i": i, "payload": "x" * 64}) + '\n' for i in range(records))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(lines)
+        f.flush()
+        os.fsync(f.fileno())
+    time.sleep(storage_ms / 1000)
+    return records
+
+
+async def _io_job(path, storage_ms):
+    written = await asyncio.to_thread(_write_records, path, storage_ms)
+    await asyncio.sleep(0.002)
+    return written
+
+
+def _event_stream(seconds, period_ms, storage_ms, load, directory):
+    """Scheduling errors (ms) of a period_ms event stream under the given I/O load"""
+    root = _TickRoot()
+    clock = SessionClock()
+    scheduler = DeadlineScheduler(root, clock)
+    period_ns = int(period_ms * 1_000_000)
+    count = int(seconds * 1000 / period_ms)
+    start_ns = clock.now() + 100_000_000
+    path = os.path.join(directory, f"load-{load}.jsonl")
+    bridge = None
+
+    def tick(i):
+        if i + 1 < count:
+            scheduler.at(start_ns + (i + 1) * period_ns, lambda: tick(i + 1), label=i + 1)
+        else:
+            root.quit()
+
+    def handler(result, error):
+        # Stands in for a small UI update after each job, then queues the next one
+        if bridge is not None and not bridge._closed:
+            bridge.run(_io_job(path, storage_ms), on_done=handler)
+
+    def inline_job():
+        _write_records(path, storage_ms)
+        if root._running:
+            root.after(2, inline_job)
+
+    scheduler.at(start_ns, lambda: tick(0), label=0)
+    if load == 'bridge':
+        bridge = AsyncBridge(root, busy=lambda: scheduler.due_within(HANDOFF_GUARD_MS)).start()
+        for _ in range(4):
+            bridge.run(_io_job(path, storage_ms), on_done=handler)
+    elif load == 'inline':
+        root.after(0, inline_job)
+    root.mainloop()
+    if bridge is not None:
+        bridge.shutdown()
+    result = summarize([error_ns / 1_000_000 for _, _, _, error_ns in scheduler.log])
+    if bridge is not None:
+        result["handoffs"] = bridge.handled
+        result["deferred_polls"] = bridge.deferred
+    return result
+
+
+def benchmark(seconds=10.0, period_ms=25, storage_ms=20):
+    """Event-stream scheduling error with no I/O, inline I/O and bridged I/O"""
+    with tempfile.TemporaryDirectory() as directory:
+        return {load: _event_stream(seconds, period_ms, storage_ms, load, directory)
+                for load in ('idle', 'inline', 'bridge')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="asyncio bridge jitter benchmark")
+    parser.add_argument('--benchmark', action='store_true', help="measure added scheduling jitter")
+    parser.add_argument('--seconds', type=float, default=10.0, help="length of each run")
+    parser.add_argument('--period', type=float, default=25, help="ms between scheduled events")
+    parser.add_argument('--storage-ms', type=float, default=20, help="simulated latency of each write")
+    args = parser.parse_args()
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    results = benchmark(args.seconds, args.period, args.storage_ms)
+    for load, summary in results.items():
+        p = summary["percentiles"]
+        print(f"{load:<7} events {summary['count']:5d}  p50 {p['p50']:7.3f}  p99 {p['p99']:7.3f}  "
+              f"max {summary['max']:7.3f} ms")
+    idle, bridge = results['idle'], results['bridge']
+    print(f"Added by the bridge: p99 {bridge['percentiles']['p99'] - idle['percentiles']['p99']:+.3f} ms, "
+          f"max {bridge['max'] - idle['max']:+.3f} ms "
+          f"({bridge['handoffs']} handoffs, {bridge['deferred_polls']} polls held back)")
+
+
+if __name__ == '__main__':
+    main()
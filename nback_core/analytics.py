@@ -0,0 +1,192 @@
+# nback_core/analytics.py
+"""Batch analytics over every saved session CSV.
+
+    python -m nback_core.analytics [--dir ~/Documents] [--out FILE] [--processes N]
+
+Finds every nback_<pid>_v<version>.csv, parses the new or changed ones in
+parallel across a process pool, and writes one summary row per participant,
+version and N level (plus an "all" row per session): signal-detection counts,
+hit and false-alarm rates, d' and percentiles of the hit reaction times.
+Files with a matching name that are not session CSVs (e.g. an exported
+schedule) are skipped and listed. Per-file results are cached with each
+file's mtime and size, so later runs only reprocess what changed.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .journal import atomic_write
+from .scoring import d_prime
+
+SESSION_FILE = re.compile(r'^nback_(.+)_v(\d+)\.csv$')
+DEFAULT_DIR = Path.home() / "Documents"
+CACHE_PATH = Path.home() / ".nback" / "analytics_cache.json"
+CACHE_FORMAT = 1
+RT_PERCENTILES = (10, 50, 90)
+# Session CSV columns the summary is computed from (see store.CSV_FIELDS)
+REQUIRED_COLUMNS = ("Participant ID", "Version", "Block N", "Is Target", "Response", "Reaction Time (ms)")
+
+SUMMARY_FIELDS = [
+    "Participant ID", "Version", "Block N", "Trials", "Hits", "Misses", "False Alarms",
+    "Correct Rejections", "Hit Rate", "False Alarm Rate", "d'", "RT Mean (ms)",
+] + [f"RT p{q} (ms)" for q in RT_PERCENTILES]
+
+
+def discover(directory):
+    """Session CSVs in directory, as {path: (participant_id, version)}"""
+    found = {}
+    for entry in os.scandir(os.path.abspath(directory)):
+        match = SESSION_FILE.match(entry.name)
+        if match and entry.is_file():
+            found[entry.path] = (match.group(1), int(match.group(2)))
+    return found
+
+
+def _signature(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _rows(participant_id, version, n, is_target, response, rt):
+    """Summary rows for one session's columns (NumPy arrays)"""
+    hit = is_target & response
+    rows = []
+    levels, group = np.unique(n, return_inverse=True)
+    groups = [(int(level), group == i) for i, level in enumerate(levels)]
+    groups.append(("all", np.ones(len(n), dtype=bool)))
+
+    for level, mask in groups:
+        targets = is_target[mask]
+        responses = response[mask]
+        hits = int(np.count_nonzero(targets & responses))
+        misses = int(np.count_nonzero(targets & ~responses))
+        false_alarms = int(np.count_nonzero(~targets & responses))
+        correct_rejections = int(np.count_nonzero(~targets & ~responses))
+        hit_rts = rt[mask & hit]
+        hit_rts = hit_rts[~np.isnan(hit_rts)]
+        rt_stats = ([float(np.mean(hit_rts))] + [float(v) for v in np.percentile(hit_rts, RT_PERCENTILES)]
+                    if hit_rts.size else [None] * (1 + len(RT_PERCENTILES)))
+        rows.append([
+            participant_id, version, level, int(np.count_nonzero(mask)),
+            hits, misses, false_alarms, correct_rejections,
+            hits / (hits + misses) if hits + misses else None,
+            false_alarms / (false_alarms + correct_rejections) if false_alarms + correct_rejections else None,
+            d_prime(hits, misses, false_alarms, correct_rejections),
+        ] + rt_stats)
+    return rows
+
+
+def analyze_file(path):
+    """Summary rows for one session CSV, or None if it is not one (runs in a worker process)"""
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header or any(name not in header for name in REQUIRED_COLUMNS):
+                return None
+            col = {name: i for i, name in enumerate(header)}
+            data = list(reader)
+        if not data:
+            return []
+        pid_i, ver_i, n_i = col["Participant ID"], col["Version"], col["Block N"]
+        target_i, response_i, rt_i = col["Is Target"], col["Response"], col["Reaction Time (ms)"]
+
+        n = np.fromiter((int(row[n_i]) for row in data), dtype=np.int16, count=len(data))
+        is_target = np.fromiter((row[target_i] == 'True' for row in data), dtype=bool, count=len(data))
+        response = np.fromiter((row[response_i] == 'True' for row in data), dtype=bool, count=len(data))
+        rt = np.fromiter((float(row[rt_i]) if row[rt_i] else np.nan for row in data),
+                         dtype=np.float64, count=len(data))
+        version = int(data[0][ver_i])
+    except (UnicodeDecodeError, csv.Error, ValueError, IndexError):
+        return None  # Right header, but rows a session never writes
+    return _rows(data[0][pid_i], version, n, is_target, response, rt)
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('format') == CACHE_FORMAT:
+            return cache['files']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_cache(files, path=CACHE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path) as f:
+        json.dump({"format": CACHE_FORMAT, "files": files}, f)
+
+
+def analyze(directory=DEFAULT_DIR, processes=None, cache_path=CACHE_PATH):
+    """Summary rows for every session in directory.
+
+    Returns (rows, reprocessed file count, paths skipped as not session CSVs).
+    The cache keeps the entries of other directories.
+    """
+    cached = load_cache(cache_path) if cache_path else {}
+    files = {}
+    stale = []
+    for path in sorted(discover(directory)):
+        signature = _signature(path)
+        entry = cached.get(path)
+        if entry and entry['signature'] == signature:
+            files[path] = entry
+        else:
+            files[path] = {"signature": signature, "rows": None}
+            stale.append(path)
+
+    if stale:
+        if processes == 1 or len(stale) == 1:
+            results = [analyze_file(path) for path in stale]
+        else:
+            workers = processes or os.cpu_count()
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(analyze_file, stale,
+                                        chunksize=max(1, len(stale) // (workers * 4))))
+        for path, rows in zip(stale, results):
+            files[path]['rows'] = rows
+        if cache_path:
+            save_cache(dict(cached, **files), cache_path)
+
+    rows = [row for entry in files.values() for row in entry['rows'] or ()]
+    rows.sort(key=lambda row: (row[0], row[1], str(row[2])))
+    skipped = [path for path, entry in files.items() if entry['rows'] is None]
+    return rows, len(stale), skipped
+
+
+def write_summary(path, rows):
+    with atomic_write(path) as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_FIELDS)
+        writer.writerows([['' if v is None else v for v in row] for row in rows])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize every saved n-back session")
+    parser.add_argument('--dir', default=str(DEFAULT_DIR), help="directory with the session CSVs")
+    parser.add_argument('--out', default=None, help="summary CSV (default: <dir>/nback_summary.csv)")
+    parser.add_argument('--processes', type=int, default=None, help="default: one per CPU")
+    parser.add_argument('--no-cache', action='store_true', help="reprocess every file")
+    args = parser.parse_args()
+
+    rows, reprocessed, skipped = analyze(args.dir, args.processes, None if args.no_cache else CACHE_PATH)
+    out = args.out or os.path.join(args.dir, "nback_summary.csv")
+    write_summary(out, rows)
+    if skipped:
+        print(f"Skipped {len(skipped)} files that are not session CSVs:")
+        for path in skipped:
+            print(f"  {path}")
+    print(f"{len(rows)} summary rows ({reprocessed} files reprocessed) written to {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+# nback_core/collector.py
+"""Optional multi-station result collector.
+
+Each experiment station runs a CollectorClient that streams completed
+trials (and block summaries) to one CollectorServer on the lab network:
+
+    python -m nback_core.collector serve --port 5757 --dir collected
+    python -m nback_core.collector selftest
+
+The wire protocol is one JSON object per line over a persistent TCP
+connection. The client sends {"station", "batch", "records"} and the
+server answers {"ack": batch, "accepted", "duplicates"} once the records
+are on disk, or {"error"} if they could not be stored. Records are
+identified by (type, session, participant, version, block, trial), where
+session is the session's start stamp, so a batch resent after a lost ack is
+stored only once while a rerun of the same participant and version is kept.
+The local journal and CSV stay the source of truth; the collector is a copy.
+"""
+import argparse
+import json
+import os
+import queue
+import random
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+DEFAULT_PORT = 5757
+
+
+def record_key(record):
+    """Identity of a collected record, for deduplication"""
+    return (record.get('type'), record.get('session'), str(record.get('participant_id')),
+            record.get('version'), record.get('block_index'), record.get('trial_index'))
+
+
+def collected_name(record):
+    """File a record is stored in; the participant ID is escaped so it cannot name a path"""
+    return f"nback_{quote(str(record.get('participant_id')), safe='')}_v{record.get('version')}.jsonl"
+
+
+class _CollectorHandler(socketserver.StreamRequestHandler):
+    """Serves one station's persistent connection, one batch per line"""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                message = json.loads(line)
+                accepted, duplicates = self.server.store(message.get('station'), message['records'])
+                reply = {"ack": message['batch'], "accepted": accepted, "duplicates": duplicates}
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                reply = {"error": str(e)}  # Nothing unstored is marked seen; the station resends
+            try:
+                self.wfile.write((json.dumps(reply) + '\n').encode('utf-8'))
+                self.wfile.flush()
+            except OSError:
+                return  # The station gave up on this connection; it resends on a new one
+
+
+class CollectorServer(socketserver.ThreadingTCPServer):
+    """Receives record batches from many stations and stores them once each.
+
+    Records are appended to <out_dir>/nback_<pid>_v<version>.jsonl (the pid
+    percent-encoded) and fsynced before the batch is acknowledged. The keys already stored are
+    read back on start, so deduplication survives a server restart.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, out_dir):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.seen = set()
+        for path in self.out_dir.glob('nback_*.jsonl'):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self.seen.add(record_key(json.loads(line)))
+                    except ValueError:
+                        continue  # Truncated by a crash mid-write
+        super().__init__(address, _CollectorHandler)
+
+    def store(self, station, records):
+        """Store the new records of a batch; returns (accepted, duplicates).
+
+        Keys only count as seen once their file is fsynced, so if a write
+        raises OSError the records it held are stored when the batch is resent.
+        """
+        by_file = {}
+        batch_keys = set()
+        duplicates = 0
+        with self.lock:
+            for record in records:
+                key = record_key(record)
+                if key in self.seen or key in batch_keys:
+                    duplicates += 1
+                    continue
+                batch_keys.add(key)
+                lines, keys = by_file.setdefault(collected_name(record), ([], []))
+                lines.append(json.dumps(dict(record, station=station)))
+                keys.append(key)
+            for name, (lines, keys) in by_file.items():
+                with open(self.out_dir / name, 'a', encoding='utf-8') as f:
+                    f.write('\n'.join(lines) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.seen.update(keys)
+        return len(batch_keys), duplicates
+
+
+class CollectorClient(threading.Thread):
+    """Streams records to a CollectorServer from a background thread.
+
+    submit() only puts the record on a bounded queue and never blocks, so it
+    is safe to call from the trial loop. The thread batches whatever is
+    queued (up to batch_size, waiting at most batch_interval for more), keeps
+    one connection open, and resends an unacknowledged batch with
+    exponential backoff and jitter. If the queue is full, records are counted
+    in `dropped` rather than blocking the caller.
+    """
+
+    def __init__(self, address, station=None, batch_size=50, batch_interval=0.5,
+                 max_pending=10000, timeout=5.0, max_backoff=30.0, debug=False):
+        super().__init__(name="nback-collector", daemon=True)
+        self.address = tuple(address)
+        self.station = station or socket.gethostname()
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.debug = debug
+        self.sent = 0
+        self.dropped = 0
+        self.failures = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closing = threading.Event()
+        self._give_up_at = None
+        self._sock = None
+        self._reader = None
+        self._next_batch = 0
+
+    def submit(self, record):
+        """Queue one record (a dict with 'type', 'participant_id', ...) for upload"""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=2.0):
+        """Send what is queued, trying for at most timeout seconds, then stop"""
+        self._give_up_at = time.monotonic() + timeout
+        self._closing.set()
+        if self.is_alive():
+            self.join(timeout + self.timeout)
+        self._disconnect()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def run(self):
+        batch = []
+        backoff_failures = 0
+        while True:
+            if not batch:
+                batch = self._take_batch()
+                if not batch:
+                    if self._closing.is_set() and self._queue.empty():
+                        return
+                    continue
+            if self._send(batch):
+                self.sent += len(batch)
+                batch = []
+                backoff_failures = 0
+                continue
+            self.failures += 1
+            backoff_failures += 1
+            if self._closing.is_set() and time.monotonic() >= self._give_up_at:
+                return  # Still in the local journal and CSV
+            delay = min(self.max_backoff, 0.25 * 2 ** backoff_failures) * random.uniform(0.5, 1.0)
+            if self._closing.is_set():
+                delay = min(delay, max(0.0, self._give_up_at - time.monotonic()))
+            time.sleep(delay)
+
+    def _take_batch(self):
+        """Up to batch_size queued records, waiting at most batch_interval for the first"""
+        try:
+            batch = [self._queue.get(timeout=self.batch_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _connect(self):
+        if self._sock is None:
+            self._sock = socket.create_connection(self.address, timeout=self.timeout)
+            self._reader = self._sock.makefile('rb')
+
+    def _disconnect(self):
+        for closable in (self._reader, self._sock):
+            if closable is not None:
+                try:
+                    closable.close()
+                except OSError:
+                    pass
+        self._sock = self._reader = None
+
+    def _send(self, batch):
+        """Send one batch and wait for its ack; returns True if acknowledged"""
+        batch_id = self._next_batch
+        message = json.dumps({"station": self.station, "batch": batch_id, "records": batch})
+        try:
+            self._connect()
+            self._sock.sendall((message + '\n').encode('utf-8'))
+            line = self._reader.readline()
+            if not line:
+                raise ConnectionError("collector closed the connection")
+            reply = json.loads(line)
+            if reply.get('ack') != batch_id:
+                raise ValueError(reply.get('error', f"unexpected reply {reply}"))
+        except (OSError, ValueError) as e:
+            if self.debug:
+                print(f"Collector upload failed: {e}")
+            self._disconnect()
+            return False
+        self._next_batch += 1
+        return True
+
+
+def selftest():
+    """Send a simulated session to a loopback server, with a stalled start and a resend"""
+    from .simulate import simulate_session
+
+    store, _ = simulate_session(1, participant_id='selftest')
+    records = [dict(store.record(i), type='trial', session='selftest') for i in range(len(store))]
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        server = CollectorServer(('127.0.0.1', 0), out_dir)
+        address = server.server_address
+
+        # The server is listening but not serving yet: the first batches time out and are retried
+        client = CollectorClient(address, station='selftest', batch_size=20, timeout=0.3)
+        client.start()
+        for record in records:
+            client.submit(record)
+        time.sleep(0.5)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client.close(timeout=10)
+
+        # A second station resending everything must not create duplicates
+        resend = CollectorClient(address, station='selftest-2')
+        resend.start()
+        for record in records:
+            resend.submit(record)
+        resend.close(timeout=10)
+        server.shutdown()
+        server.server_close()
+
+        with open(Path(out_dir) / 'nback_selftest_v1.jsonl', encoding='utf-8') as f:
+            stored = [json.loads(line) for line in f]
+    ok = len(stored) == len(records) and client.sent == len(records) and resend.sent == len(records)
+    print(f"sent {client.sent} records ({client.failures} failed attempts, retried), "
+          f"resent {resend.sent}, stored {len(stored)} of {len(records)}: {'OK' if ok else 'FAILED'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="N-back result collector")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help="run the collector server")
+    serve.add_argument('--host', default='0.0.0.0')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--dir', default='collected', help="where collected sessions are stored")
+    sub.add_parser('selftest', help="round-trip a simulated session over loopback")
+    args = parser.parse_args()
+
+    if args.command == 'selftest':
+        raise SystemExit(0 if selftest() else 1)
+    with CollectorServer((args.host, args.port), args.dir) as server:
+        print(f"Collecting on {args.host}:{args.port} into {args.dir}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+# nback_core/config.py
+"""Experiment design shared by the GUI and the headless simulator"""
+
+STIMULUS_DURATION = 0.5  # seconds (500 ms) for main experiment
+TUTORIAL_STIMULUS_DURATION = 2.0  # 2 seconds for tutorial
+ITI_DURATION = 1.5  # seconds in between stimuli
+BLOCK_BANNER_DURATION = 1.5  # seconds the "N-back" banner is shown before each block
+TRAINING_TRIALS = 15
+EXPERIMENT_TRIALS = 30
+TARGET_PERCENTAGE = 0.2
+N_LEVELS = [1, 2, 3, 4, 5]
+#DIGITS = list(range(10)) - if we want to use numbers instead of letters
+LETTERS = ['B', 'F', 'G', 'H', 'K', 'M', 'Q', 'T', 'R', 'X']  # Phonologically distinct letters
+SEEDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo']  # Seed words for versions 1-5; later versions derive their own
+NUM_VERSIONS = 5  # Number of visits (versions) in the study
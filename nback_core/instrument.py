@@ -0,0 +1,117 @@
+# nback_core/instrument.py
+"""Per-callback wall-time histograms and optional cProfile capture.
+
+    callbacks = CallbackTimer(enabled=True, profile=True)
+
+    @callbacks.timed()
+    def show_frame(name): ...
+
+    callbacks.instrument(session, '_onset', 'session.onset')  # an existing object's method
+
+Each name gets a fixed-size Histogram of wall time per call, in ms. When the
+timer is disabled, timed() returns the function itself and instrument()
+leaves the object alone, so uninstrumented runs pay nothing.
+"""
+import cProfile
+import functools
+import json
+import marshal
+import time
+
+from .journal import atomic_write
+from .stats import Histogram, LATENCY_EDGES_MS
+
+REPORT_FORMAT = 1
+PROFILE_TOP = 30  # Functions listed in the report, by cumulative time
+
+
+class CallbackTimer:
+    """Wall time of instrumented callbacks, plus a cProfile window on demand"""
+
+    def __init__(self, enabled=False, profile=False, edges=LATENCY_EDGES_MS):
+        self.enabled = enabled
+        self.profile = profile
+        self.edges = edges
+        self.histograms = {}
+        self._profiler = None
+        self._profile_started = None
+        self._profile_seconds = None
+        self._profile_stats = None
+
+    def histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram(self.edges)
+        return hist
+
+    def timed(self, name=None):
+        """Decorator recording each call's wall time under name (default: the function's)"""
+        def decorate(fn):
+            if not self.enabled:
+                return fn
+            hist = self.histogram(name or fn.__name__)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    hist.add((time.perf_counter_ns() - start) / 1_000_000)
+            return wrapper
+        return decorate
+
+    def instrument(self, obj, attr, name=None):
+        """Time obj.attr (e.g. a bound method) by replacing it on the instance"""
+        if self.enabled:
+            setattr(obj, attr, self.timed(name or attr)(getattr(obj, attr)))
+        return obj
+
+    def start_profile(self):
+        """Start cProfile on the calling thread, if profiling is on and not already running"""
+        if self.profile and self._profiler is None and self._profile_stats is None:
+            self._profiler = cProfile.Profile()
+            self._profile_started = time.perf_counter()
+            self._profiler.enable()
+
+    def stop_profile(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profile_seconds = time.perf_counter() - self._profile_started
+            self._profiler.create_stats()
+            self._profile_stats = self._profiler.stats
+            self._profiler = None
+
+    def snapshot(self):
+        """(report dict, raw profile stats or None), safe to hand to another thread"""
+        report = {
+            "format": REPORT_FORMAT,
+            "unit": "ms",
+            "callbacks": {name: hist.to_dict() for name, hist in sorted(self.histograms.items())},
+        }
+        if self._profile_stats is not None:
+            report["profile"] = {"seconds": self._profile_seconds,
+                                 "top": _top_functions(self._profile_stats, PROFILE_TOP)}
+        return report, self._profile_stats
+
+
+def _top_functions(stats, count):
+    """Functions with the most cumulative time, from cProfile's raw stats"""
+    rows = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.items():
+        rows.append({"function": f"{filename}:{line}({func})", "calls": ncalls,
+                     "total_ms": round(tottime * 1000, 3), "cumulative_ms": round(cumtime * 1000, 3)})
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:count]
+
+
+def write_report(path, report, profile_stats=None):
+    """Write report as JSON to path and profile_stats next to it as a .prof file.
+
+    The .prof file is in pstats format: python -m pstats <file>
+    """
+    with atomic_write(path) as f:
+        json.dump(report, f, indent=2)
+    if profile_stats is not None:
+        with open(path.with_suffix('.prof'), 'wb') as f:
+            marshal.dump(profile_stats, f)
@@ -0,0 +1,136 @@
+# nback_core/journal.py
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+SESSION = 'session'
+TRIAL = 'trial'
+RESUME = 'resume'
+BLOCK = 'block'  # Performance summary written when a block finishes
+COMPLETE = 'complete'
+
+
+class TrialJournal:
+    """Append-only JSON-lines journal of a session, written as trials complete.
+
+    append() only buffers the record in memory, so it is safe to call on a
+    stimulus deadline. flush() writes the buffer, then flushes and fsyncs the
+    file; call maybe_flush() from slack time (the ITI) and it only does the
+    I/O once flush_every records have accumulated. Each line is a complete
+    JSON object, so a crash can at worst lose the unflushed tail and leave one
+    truncated line, which read_journal() skips.
+    """
+
+    def __init__(self, path, flush_every=5):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self._buffer = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def append(self, record_type, **fields):
+        fields['type'] = record_type
+        self._buffer.append(json.dumps(fields))
+
+    def maybe_flush(self):
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer or self._file is None:
+            return
+        self._file.write('\n'.join(self._buffer) + '\n')
+        self._buffer.clear()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+
+def start_journal(path, flush_every=5, **session_fields):
+    """Open a fresh journal at path and write its session header.
+
+    A journal already at path (e.g. from an interrupted earlier run) is kept
+    under a timestamped name rather than overwritten.
+    """
+    path = Path(path)
+    if path.exists():
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(path.stat().st_mtime))
+        os.replace(path, path.with_name(f"{path.stem}-{stamp}{path.suffix}"))
+    journal = TrialJournal(path, flush_every)
+    journal.append(SESSION, **session_fields)
+    journal.flush()
+    return journal
+
+
+def resume_journal(path, flush_every=5, **resume_fields):
+    """Reopen an interrupted journal and record that the session resumed"""
+    path = Path(path)
+    # A crash mid-write can leave the last line unterminated; never append onto it
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+    journal = TrialJournal(path, flush_every)
+    journal.append(RESUME, **resume_fields)
+    journal.flush()
+    return journal
+
+
+def find_unfinished(path):
+    """Records of an interrupted session at path, or None.
+
+    A session is unfinished if its journal has a header and at least one trial
+    but no completion marker.
+    """
+    if not os.path.exists(path):
+        return None
+    records = read_journal(path)
+    if not records or records[0].get('type') != SESSION:
+        return None
+    if any(r['type'] == COMPLETE for r in records):
+        return None
+    if not any(r['type'] == TRIAL for r in records):
+        return None
+    return records
+
+
+def read_journal(path):
+    """All complete records in a journal, in order"""
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # Truncated by a crash mid-write
+    return records
+
+
+@contextmanager
+def atomic_write(path, newline=''):
+    """Open a temp file next to path for writing and rename it into place on success.
+
+    Readers either see the previous file or the complete new one, never a
+    partially written file.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, 'w', newline=newline, encoding='utf-8') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
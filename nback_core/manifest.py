@@ -0,0 +1,189 @@
+# nback_core/manifest.py
+import hashlib
+import json
+import random
+import sys
+from pathlib import Path
+
+from .config import N_LEVELS, EXPERIMENT_TRIALS, TARGET_PERCENTAGE, LETTERS, SEEDS
+from .journal import atomic_write
+
+# Bump whenever generate_blocks() changes, so cached manifests are rebuilt
+GENERATOR_VERSION = 1
+MANIFEST_FORMAT = 1
+
+
+def stable_seed(seed_word):
+    """64-bit seed from a hash of the seed word (the same on every platform and run)"""
+    return int.from_bytes(hashlib.sha256(seed_word.encode('utf-8')).digest()[:8], 'big')
+
+
+def seeded_rng(seed_word):
+    """Create a seeded random number generator"""
+    return random.Random(stable_seed(seed_word))
+
+
+def version_seed_word(version, seeds):
+    """Seed word for a version: the configured words first, then derived ones"""
+    if version <= len(seeds):
+        return seeds[version - 1]
+    return f"version-{version}"
+
+
+def generate_blocks(rng, n_levels, num_trials, target_percentage, letters):
+    """Generate one block per N level: a list of {"n", "trials": [{"letter", "is_target"}]}"""
+    blocks = []
+    # Letters allowed on a non-target trial, per n-back letter
+    alternatives = {letter: [d for d in letters if d != letter] for letter in letters}
+    for n in n_levels:
+        trials = []
+        target_indices = set()
+
+        # Only create targets if we have enough trials
+        if num_trials > n:
+            num_targets = max(1, int(num_trials * target_percentage))
+            target_indices = set(rng.sample(range(n, num_trials), num_targets))
+
+        for i in range(num_trials):
+            is_target = False
+            letter = None
+
+            if i < n:
+                # First n trials can't be targets
+                letter = rng.choice(letters)
+            elif i in target_indices:
+                # Target trial
+                letter = trials[i - n]['letter']
+                is_target = True
+            else:
+                # Non-target trial
+                prev_letter = trials[i - n]['letter']
+                letter = rng.choice(alternatives[prev_letter])
+
+            trials.append({"letter": letter, "is_target": is_target})
+
+        blocks.append({"n": n, "trials": trials})
+    return blocks
+
+
+def manifest_params(n_levels, num_trials, target_percentage, letters, seeds):
+    """Everything the generated sequences depend on"""
+    return {
+        "generator": GENERATOR_VERSION,
+        "n_levels": list(n_levels),
+        "trials": num_trials,
+        "target_percentage": target_percentage,
+        "letters": list(letters),
+        "seeds": list(seeds),
+    }
+
+
+def default_params():
+    """Manifest parameters for the experiment's configuration (nback_core.config)"""
+    return manifest_params(N_LEVELS, EXPERIMENT_TRIALS, TARGET_PERCENTAGE, LETTERS, SEEDS)
+
+
+def _pack(blocks):
+    """Compact on-disk form: one letter string and one 0/1 target string per block"""
+    return [{"n": block['n'],
+             "letters": ''.join(t['letter'] for t in block['trials']),
+             "targets": ''.join('1' if t['is_target'] else '0' for t in block['trials'])}
+            for block in blocks]
+
+
+def _unpack(packed):
+    return [{"n": block['n'],
+             "trials": [{"letter": letter, "is_target": target == '1'}
+                        for letter, target in zip(block['letters'], block['targets'])]}
+            for block in packed]
+
+
+def _checksum(params, versions):
+    payload = json.dumps({"params": params, "versions": versions},
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def generate_version(version, params=None):
+    """Blocks for one version, generated from its seed (default: the configured experiment)"""
+    if params is None:
+        params = default_params()
+    rng = seeded_rng(version_seed_word(version, params['seeds']))
+    return generate_blocks(rng, params['n_levels'], params['trials'],
+                           params['target_percentage'], params['letters'])
+
+
+class SequenceManifest:
+    """Pre-generated block sequences for every version, with a checksum.
+
+    Versions are stored in the compact packed form and expanded into the
+    block/trial dicts the experiment uses on request.
+    """
+
+    def __init__(self, params, versions):
+        self.params = params
+        self.versions = versions  # str(version) -> packed blocks
+        self.checksum = _checksum(params, versions)
+
+    @classmethod
+    def build(cls, params, num_versions):
+        versions = {str(v): _pack(generate_version(v, params))
+                    for v in range(1, num_versions + 1)}
+        return cls(params, versions)
+
+    def __len__(self):
+        return len(self.versions)
+
+    def blocks(self, version):
+        """Blocks for a version (generated on the fly if beyond the manifest)"""
+        packed = self.versions.get(str(version))
+        if packed is None:
+            return generate_version(version, self.params)
+        return _unpack(packed)
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(path) as f:
+            json.dump({"format": MANIFEST_FORMAT, "params": self.params,
+                       "checksum": self.checksum, "versions": self.versions},
+                      f, separators=(',', ':'))
+
+    @classmethod
+    def read(cls, path):
+        """Read a manifest file; raises ValueError if its checksum does not match"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != MANIFEST_FORMAT:
+            raise ValueError(f"unsupported manifest format {data.get('format')}")
+        manifest = cls(data['params'], data['versions'])
+        if manifest.checksum != data['checksum']:
+            raise ValueError("manifest checksum mismatch")
+        return manifest
+
+    def verify(self):
+        """Versions whose stored blocks differ from a fresh regeneration"""
+        return [int(v) for v, packed in self.versions.items()
+                if _pack(generate_version(int(v), self.params)) != packed]
+
+
+def load_manifest(path, params, num_versions):
+    """Load the cached manifest, rebuilding it if missing, corrupt or stale.
+
+    Stale means generated with different parameters (N levels, trial count,
+    letters, seeds or generator version) or for fewer than num_versions.
+    Returns (manifest, rebuilt). The file is only a cache: if it cannot be
+    written, the rebuilt manifest is still returned.
+    """
+    try:
+        manifest = SequenceManifest.read(path)
+        if manifest.params == params and len(manifest) >= num_versions:
+            return manifest, False
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    manifest = SequenceManifest.build(params, num_versions)
+    try:
+        manifest.save(path)
+    except OSError as e:
+        print(f"Could not cache the sequence manifest at {path}: {e}", file=sys.stderr)
+    return manifest, True
@@ -0,0 +1,105 @@
+# nback_core/persist.py
+"""Write-behind persistence: file writes run on a worker thread, in order.
+
+Saving a session writes several CSVs. On a network-mounted home directory
+that can take seconds, and neither the end screen nor the trial loop should
+wait for it. Completions reach the Tk thread through the AsyncBridge's
+guarded poll (nback_core.aio), like every other background result.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+RETRY_ATTEMPTS = 5
+RETRY_BASE_S = 0.5  # First retry delay; doubles with every failed attempt
+RETRY_MAX_S = 8.0
+# OSErrors that another attempt cannot fix
+PERMANENT_ERRORS = (PermissionError, IsADirectoryError, NotADirectoryError)
+
+
+class WriteBehind(threading.Thread):
+    """Runs queued write jobs one at a time on a daemon thread.
+
+    submit(job, on_done) queues a callable that does the writing and never
+    blocks; it returns False when max_pending jobs are already waiting, so
+    memory stays bounded (each job holds its own data), unless force is set
+    for a job that must not be dropped. A job raising OSError is retried
+    with exponential backoff, up to `attempts` tries in all, since network
+    filesystems fail transiently; PERMANENT_ERRORS and any other exception
+    fail it at once. on_done(result, error) is called on the Tk thread by
+    bridge.watch(), so it is held back while a trial event is close. flush()
+    waits until every queued job has run, e.g. before the application exits.
+    """
+
+    def __init__(self, bridge, max_pending=16, attempts=RETRY_ATTEMPTS, retry_s=RETRY_BASE_S,
+                 max_retry_s=RETRY_MAX_S, debug=False):
+        super().__init__(name="nback-persist", daemon=True)
+        self.bridge = bridge
+        self.max_pending = max_pending
+        self.attempts = attempts
+        self.retry_s = retry_s
+        self.max_retry_s = max_retry_s
+        self.debug = debug
+        self.retries = 0
+        self._queue = queue.Queue()  # (job, Future); bounded by submit()
+        self._unfinished = 0  # Jobs queued or running
+        self._idle = threading.Condition()
+
+    def submit(self, job, on_done=None, force=False):
+        """Queue job() to run on the worker; returns False if max_pending jobs are waiting"""
+        future = Future()
+        with self._idle:
+            if self._unfinished >= self.max_pending and not force:
+                return False
+            self._unfinished += 1
+            self._queue.put((job, future))
+        if on_done is not None:
+            self.bridge.watch(future, on_done)
+        return True
+
+    def pending(self):
+        with self._idle:
+            return self._unfinished
+
+    def run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job, future = item
+            result, error = self._run_job(job)
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+            with self._idle:
+                self._unfinished -= 1
+                self._idle.notify_all()
+
+    def _run_job(self, job):
+        delay = self.retry_s
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return job(), None
+            except OSError as e:
+                if attempt == self.attempts or isinstance(e, PERMANENT_ERRORS):
+                    return None, e
+                if self.debug:
+                    print(f"Write failed ({e}), retrying in {delay:.1f}s")
+                self.retries += 1
+                time.sleep(delay)
+                delay = min(self.max_retry_s, delay * 2)
+            except Exception as e:
+                return None, e
+
+    def flush(self, timeout=None):
+        """Wait until every queued job has run; returns True if none are left"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def close(self, timeout=None):
+        """Flush, then stop the worker; if that timed out, jobs still queued die with the process"""
+        done = self.flush(timeout)
+        self._queue.put(None)
+        return done
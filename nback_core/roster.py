@@ -0,0 +1,105 @@
+# nback_core/roster.py
+import csv
+import os
+import threading
+from collections import namedtuple
+
+# One roster row; trial_number is kept as the raw string from the sheet
+RosterEntry = namedtuple('RosterEntry', ['name', 'pid', 'trial_number'])
+
+
+class RosterError(Exception):
+    """The roster file is missing or not in the expected format"""
+
+
+def normalize_name(name):
+    """Case- and whitespace-insensitive form of a participant name"""
+    return ' '.join(name.split()).lower()
+
+
+class RosterIndex:
+    """Participant roster (sample_sheet.csv) indexed by name and by ID.
+
+    The file is parsed once into two hash maps; refresh() re-stats it and only
+    parses it again when its mtime or size has changed, so repeated login
+    attempts cost one stat() call plus a dict lookup. Names that appear on more
+    than one row are collected in `duplicates` instead of silently resolving
+    to whichever row comes first. `has_pids` is False when the sheet has no
+    'Participant iD' column, so there are no IDs to check against.
+
+    refresh() may be called from the background I/O thread and the Tk thread
+    at once; a lock keeps the stat, reload and swap of one call together.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.by_name = {}
+        self.by_pid = {}
+        self.duplicates = set()
+        self.has_pids = False
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Reload the roster if the file changed; returns True if it was (re)loaded"""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._signature = None
+                self.by_name, self.by_pid, self.duplicates, self.has_pids = {}, {}, set(), False
+                raise RosterError(f"{os.path.basename(self.path)} not found")
+
+            signature = (st.st_mtime_ns, st.st_size)
+            if signature == self._signature:
+                return False
+            self._load()
+            self._signature = signature
+            return True
+
+    def _load(self):
+        by_name = {}
+        by_pid = {}
+        duplicates = set()
+        with open(self.path, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header or 'Participant' not in header:
+                raise RosterError("Invalid CSV format")
+            name_col = header.index('Participant')
+            pid_col = header.index('Participant iD') if 'Participant iD' in header else None
+            trial_col = header.index('Trial Number') if 'Trial Number' in header else None
+
+            for row in reader:
+                if len(row) <= name_col:
+                    continue
+                key = normalize_name(row[name_col])
+                if not key:
+                    continue
+                entry = RosterEntry(
+                    row[name_col].strip(),
+                    row[pid_col].strip() if pid_col is not None and pid_col < len(row) else '',
+                    row[trial_col].strip() if trial_col is not None and trial_col < len(row) else '')
+                if key in by_name:
+                    duplicates.add(key)
+                else:
+                    by_name[key] = entry
+                if entry.pid:
+                    by_pid.setdefault(entry.pid, entry)
+
+        self.by_name, self.by_pid, self.duplicates = by_name, by_pid, duplicates
+        self.has_pids = pid_col is not None
+
+    def find_name(self, name):
+        """Roster entry for a full name, or None"""
+        return self.by_name.get(normalize_name(name))
+
+    def is_duplicate(self, name):
+        return normalize_name(name) in self.duplicates
+
+    def find_pid(self, pid):
+        """Roster entry for a participant ID, or None"""
+        return self.by_pid.get(pid.strip())
+
+    def __len__(self):
+        return len(self.by_name)
@@ -0,0 +1,150 @@
+# nback_core/scoring.py
+import math
+from statistics import NormalDist
+
+from .stats import RunningStats
+
+_z = NormalDist().inv_cdf
+
+
+def d_prime(hits, misses, false_alarms, correct_rejections):
+    """Sensitivity d' = z(hit rate) - z(false-alarm rate).
+
+    Uses the log-linear correction (add 0.5 to each count, 1 to each total),
+    so perfect or empty rates still give a finite value.
+    """
+    hit_rate = (hits + 0.5) / (hits + misses + 1)
+    false_alarm_rate = (false_alarms + 0.5) / (false_alarms + correct_rejections + 1)
+    return _z(hit_rate) - _z(false_alarm_rate)
+
+
+def score_trials(is_target, response, rt):
+    """Signal-detection summary of parallel per-trial columns.
+
+    rt is in ms, NaN or None where there was no press. Returns counts,
+    rates, d' and the mean RT of hits (None without hits).
+    """
+    hits = misses = false_alarms = correct_rejections = 0
+    hit_rt_total = 0.0
+    for target, pressed, trial_rt in zip(is_target, response, rt):
+        if target:
+            if pressed:
+                hits += 1
+                hit_rt_total += trial_rt
+            else:
+                misses += 1
+        elif pressed:
+            false_alarms += 1
+        else:
+            correct_rejections += 1
+    targets = hits + misses
+    non_targets = false_alarms + correct_rejections
+    return {
+        "trials": targets + non_targets,
+        "hits": hits,
+        "misses": misses,
+        "false_alarms": false_alarms,
+        "correct_rejections": correct_rejections,
+        "hit_rate": hits / targets if targets else math.nan,
+        "false_alarm_rate": false_alarms / non_targets if non_targets else math.nan,
+        "d_prime": d_prime(hits, misses, false_alarms, correct_rejections),
+        "mean_hit_rt": hit_rt_total / hits if hits else None,
+    }
+
+
+def score(store):
+    """Score a whole TrialStore"""
+    return score_trials(store.is_target, store.response, store.rt)
+
+
+def score_by_n(store):
+    """Score a TrialStore separately for each N level: {n: summary}"""
+    columns = {}
+    for n, target, pressed, trial_rt in zip(store.block_n, store.is_target, store.response, store.rt):
+        column = columns.setdefault(n, ([], [], []))
+        column[0].append(target)
+        column[1].append(pressed)
+        column[2].append(trial_rt)
+    return {n: score_trials(*column) for n, column in sorted(columns.items())}
+
+
+class BlockStats:
+    """Running performance for one block, updated in O(1) per trial.
+
+    The reaction-time mean and standard deviation are over hits.
+    """
+
+    def __init__(self, block_index, n):
+        self.block_index = block_index
+        self.n = n
+        self.hits = self.misses = self.false_alarms = self.correct_rejections = 0
+        self.rt = RunningStats()
+
+    def add(self, is_target, response, rt):
+        if is_target:
+            if response:
+                self.hits += 1
+                if rt is not None and not math.isnan(rt):
+                    self.rt.add(rt)
+            else:
+                self.misses += 1
+        elif response:
+            self.false_alarms += 1
+        else:
+            self.correct_rejections += 1
+
+    @property
+    def trials(self):
+        return self.hits + self.misses + self.false_alarms + self.correct_rejections
+
+    def d_prime(self):
+        return d_prime(self.hits, self.misses, self.false_alarms, self.correct_rejections)
+
+    def summary(self):
+        targets = self.hits + self.misses
+        non_targets = self.false_alarms + self.correct_rejections
+        return {
+            "block_index": self.block_index,
+            "block_n": self.n,
+            "trials": self.trials,
+            "hits": self.hits,
+            "misses": self.misses,
+            "false_alarms": self.false_alarms,
+            "correct_rejections": self.correct_rejections,
+            "hit_rate": self.hits / targets if targets else None,
+            "false_alarm_rate": self.false_alarms / non_targets if non_targets else None,
+            "d_prime": self.d_prime(),
+            "rt_mean": self.rt.mean if self.rt.count else None,
+            "rt_sd": self.rt.stdev(),
+        }
+
+
+class SessionStats:
+    """BlockStats for every block of a session, keyed by block index"""
+
+    def __init__(self):
+        self.blocks = {}
+
+    def add(self, block_index, n, is_target, response, rt):
+        """Count one trial; returns its block's stats"""
+        stats = self.blocks.get(block_index)
+        if stats is None:
+            stats = self.blocks[block_index] = BlockStats(block_index, n)
+        stats.add(is_target, response, rt)
+        return stats
+
+    def block(self, block_index):
+        """Stats of a block, or None if it has no trials yet"""
+        return self.blocks.get(block_index)
+
+    def summaries(self):
+        return [self.blocks[i].summary() for i in sorted(self.blocks)]
+
+    @classmethod
+    def from_store(cls, store):
+        """Stats of the trials already in a TrialStore (e.g. a resumed session)"""
+        stats = cls()
+        for block_index, n, is_target, response, rt in zip(
+                store.block_index, store.block_n, store.is_target, store.response, store.rt):
+            stats.add(block_index, n, bool(is_target), bool(response), rt)
+        return stats
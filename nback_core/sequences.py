@@ -0,0 +1,274 @@
+# nback_core/sequences.py
+"""Vectorized n-back sequence generation for pilot studies and counterbalancing.
+
+Generates many blocks at once with NumPy: the trial positions are walked in
+order (each letter depends on earlier ones), but every step is done for all
+blocks in one array operation. Targets are known before the letters, so
+the letters a later target will copy are chosen to keep it off lures and
+runs, and 1-back targets are never placed next to each other (two in a row
+make a run of three and a 2-back lure). A block that still breaks a
+constraint is redrawn, as a safeguard. Run as a script to benchmark it:
+
+    python -m nback_core.sequences --benchmark
+"""
+import argparse
+import time
+
+import numpy as np
+
+from .manifest import stable_seed, seeded_rng, generate_blocks
+
+MAX_ATTEMPTS = 1000  # Redraws of a block before its constraints are taken as unsatisfiable
+
+
+def _excluded_lags(n, avoid_lures, max_run):
+    """Lags whose letters a non-target trial may have to avoid at once"""
+    lags = {n}
+    if avoid_lures:
+        lags |= {n + 1, 1}  # 1: a letter a later target copies must differ from the one before it
+        if n > 1:
+            lags.add(n - 1)
+    if max_run is not None:
+        lags.add(1)
+        if n > 1:
+            lags.add(n - 1)  # The letter the next trial copies if it is a target
+    return lags
+
+
+def generate_sequences(n, num_trials, count, target_percentage, num_letters, seed,
+                       avoid_lures=True, max_run=2):
+    """Generate `count` n-back blocks.
+
+    Returns (letters, targets): a uint8 array of letter indices and a bool
+    array marking targets, both shaped (count, num_trials). Each block gets
+    max(1, int(num_trials * target_percentage)) targets at positions >= n,
+    like the experiment's own generator. Non-target trials never match the
+    letter n back; with avoid_lures no trial, target or not, matches (n-1) or
+    (n+1) back, and no letter is repeated more than max_run times in a row
+    (max_run=None disables this). Target trials always copy the letter n
+    back. The same seed (an int or a seed word) always gives the same
+    sequences.
+
+    Raises ValueError if num_letters is too small for the constraints, or if
+    the targets cannot be placed without breaking them.
+    """
+    lags = _excluded_lags(n, avoid_lures, max_run)
+    if num_letters <= len(lags):
+        raise ValueError(f"{n}-back needs at least {len(lags) + 1} letters to satisfy its "
+                         f"constraints, got {num_letters}")
+    num_targets = min(max(1, int(num_trials * target_percentage)), num_trials - n) if num_trials > n else 0
+    if n == 1 and num_targets and max_run is not None and max_run < 2:
+        raise ValueError("a 1-back target repeats the letter before it, so max_run must be at least 2")
+    spaced = _spaced_targets(n, avoid_lures, max_run)
+    if spaced and num_targets > (num_trials - n + 1) // 2:
+        raise ValueError(f"cannot place {num_targets} targets in {num_trials} trials of {n}-back "
+                         f"without two in a row")
+    if isinstance(seed, str):
+        seed = stable_seed(seed)
+    rng = np.random.default_rng(seed)
+
+    letters = np.zeros((count, num_trials), dtype=np.uint8)
+    targets = np.zeros((count, num_trials), dtype=bool)
+    pending = np.arange(count)
+    for _ in range(MAX_ATTEMPTS):
+        drawn_letters, drawn_targets = _draw(rng, n, num_trials, len(pending), num_targets,
+                                             num_letters, avoid_lures, max_run, spaced)
+        ok = ~_violations(drawn_letters, drawn_targets, n, avoid_lures, max_run).any(axis=1)
+        letters[pending[ok]] = drawn_letters[ok]
+        targets[pending[ok]] = drawn_targets[ok]
+        pending = pending[~ok]
+        if not pending.size:
+            return letters, targets
+    raise ValueError(f"cannot place {num_targets} targets in {num_trials} trials of {n}-back "
+                     f"without breaking the run or lure constraints")
+
+
+def _spaced_targets(n, avoid_lures, max_run):
+    """Whether targets are kept apart: adjacent 1-back targets are a 2-back lure and lengthen a run"""
+    return n == 1 and (avoid_lures or max_run is not None)
+
+
+def _draw(rng, n, num_trials, count, num_targets, num_letters, avoid_lures, max_run, spaced=False):
+    """One candidate (letters, targets) per block; some may still break a constraint"""
+    # Target positions: a random subset of [n, num_trials) per block. Spaced, they are
+    # drawn from num_targets - 1 fewer slots and the k-th is moved k places right,
+    # which gives every arrangement without two adjacent targets the same chance.
+    targets = np.zeros((count, num_trials), dtype=bool)
+    if num_targets:
+        slots = num_trials - n - (num_targets - 1 if spaced else 0)
+        order = np.argsort(rng.random((count, slots)), axis=1)[:, :num_targets]
+        if spaced:
+            order = np.sort(order, axis=1) + np.arange(num_targets)
+        np.put_along_axis(targets[:, n:], order, True, axis=1)
+
+    letters = np.zeros((count, num_trials), dtype=np.uint8)
+    rows = np.arange(count)
+    run_length = np.zeros(count, dtype=np.int64)
+    # streak[:, j]: consecutive targets from trial j on
+    streak = np.zeros((count, num_trials + 1), dtype=np.int64)
+    for j in range(num_trials - 1, -1, -1):
+        streak[:, j] = np.where(targets[:, j], streak[:, j + 1] + 1, 0)
+
+    for i in range(num_trials):
+        allowed = np.ones((count, num_letters), dtype=bool)
+        excluded = []
+        if i >= n:
+            excluded.append(i - n)
+        if avoid_lures:
+            if n > 1 and i - (n - 1) >= 0:
+                excluded.append(i - (n - 1))
+            if i - (n + 1) >= 0:
+                excluded.append(i - (n + 1))
+        for j in excluded:
+            allowed[rows, letters[:, j]] = False
+        if avoid_lures and i > 0:
+            # A target at i+n copies this letter, and one at i+n-1 copies the one before it;
+            # either is an (n+1)- or (n-1)-back lure if the two letters are the same
+            copied = targets[:, i + n] if i + n < num_trials else np.zeros(count, dtype=bool)
+            if n > 1 and i + n - 1 < num_trials:
+                copied = copied | targets[:, i + n - 1]
+            allowed[rows[copied], letters[copied, i - 1]] = False
+        if max_run is not None and i > 0:
+            at_limit = run_length >= max_run
+            allowed[rows[at_limit], letters[at_limit, i - 1]] = False
+            if i + 1 < num_trials:
+                allowed &= ~_overflowing_letters(letters, streak[:, i + 1], i, n, run_length,
+                                                 max_run, num_letters)
+        if not (allowed.any(axis=1) | targets[:, i]).all():
+            raise ValueError(f"no letter satisfies the constraints at trial {i} of {n}-back")
+
+        # Uniform choice among allowed letters: the allowed letter with the highest random score
+        scores = rng.random((count, num_letters))
+        scores[~allowed] = -1.0
+        choice = scores.argmax(axis=1).astype(np.uint8)
+
+        if i >= n:
+            choice = np.where(targets[:, i], letters[:, i - n], choice)
+        letters[:, i] = choice
+
+        if i > 0:
+            run_length = np.where(choice == letters[:, i - 1], run_length + 1, 1)
+        else:
+            run_length[:] = 1
+
+    return letters, targets
+
+
+def _overflowing_letters(letters, ahead, i, n, run_length, max_run, num_letters):
+    """Bool array (blocks, letters) marking the letters at trial i that would let the
+    `ahead` targets right after it, which copy letters n back (this one included),
+    extend a run past max_run"""
+    count = len(ahead)
+    overflow = np.zeros((count, num_letters), dtype=bool)
+    steps = int(ahead.max(initial=0))
+    if not steps:
+        return overflow
+    candidate = np.broadcast_to(np.arange(num_letters, dtype=np.uint8), (count, num_letters))
+    run = np.where(candidate == letters[:, i - 1, None], run_length[:, None] + 1, 1)
+    upcoming = [candidate]  # Letters from trial i on, for each candidate
+    for k in range(1, steps + 1):
+        source = i + k - n
+        letter = (np.broadcast_to(letters[:, source, None], (count, num_letters)) if source < i
+                  else upcoming[source - i])
+        run = np.where(letter == upcoming[-1], run + 1, 1)
+        overflow |= (ahead >= k)[:, None] & (run > max_run)
+        upcoming.append(letter)
+    return overflow
+
+
+def to_blocks(letters, targets, n, letter_names):
+    """Convert generated arrays to the experiment's block dicts"""
+    names = np.asarray(letter_names)[letters]
+    return [{"n": n,
+             "trials": [{"letter": str(letter), "is_target": bool(target)}
+                        for letter, target in zip(row_letters, row_targets)]}
+            for row_letters, row_targets in zip(names, targets)]
+
+
+def _violations(letters, targets, n, avoid_lures=True, max_run=2):
+    """Bool array marking the trials that break a constraint"""
+    count, num_trials = letters.shape
+    bad = np.zeros((count, num_trials), dtype=bool)
+    if 0 < n < num_trials:
+        bad[:, n:] |= (letters[:, n:] == letters[:, :-n]) & ~targets[:, n:]
+    for lag in ([n - 1, n + 1] if avoid_lures else []):
+        if 0 < lag < num_trials:
+            bad[:, lag:] |= letters[:, lag:] == letters[:, :-lag]
+    if max_run is not None and max_run < num_trials:
+        repeat = np.ones((count, num_trials - max_run), dtype=bool)
+        for k in range(1, max_run + 1):
+            repeat &= letters[:, max_run:] == letters[:, max_run - k:num_trials - k]
+        bad[:, max_run:] |= repeat
+    return bad
+
+
+def count_violations(letters, targets, n, avoid_lures=True, max_run=2):
+    """Number of trials, targets included, breaking the constraints (0 for generated blocks)"""
+    return int(_violations(letters, targets, n, avoid_lures, max_run).sum())
+
+
+def benchmark(count, num_trials, n_levels, target_percentage, num_letters, repeats=3):
+    """Blocks per second for the vectorized and the pure-Python generator.
+
+    The Python baseline is manifest.generate_blocks, which only keeps
+    non-targets off the n-back letter (no lure or run constraints), so it does
+    less work per block than generate_sequences.
+    """
+    letter_names = [chr(ord('A') + i) for i in range(num_letters)]
+    results = {}
+
+    best = float('inf')
+    for r in range(repeats):
+        start = time.perf_counter()
+        for n in n_levels:
+            generate_sequences(n, num_trials, count, target_percentage, num_letters, seed=r)
+        best = min(best, time.perf_counter() - start)
+    results['numpy'] = count * len(n_levels) / best
+
+    # The reference generator is much slower; time a smaller batch
+    python_count = max(1, min(count, 2000))
+    best = float('inf')
+    for r in range(repeats):
+        rng = seeded_rng(f"bench-{r}")
+        start = time.perf_counter()
+        for _ in range(python_count):
+            generate_blocks(rng, n_levels, num_trials, target_percentage, letter_names)
+        best = min(best, time.perf_counter() - start)
+    results['python'] = python_count * len(n_levels) / best
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized n-back sequence generator")
+    parser.add_argument('--benchmark', action='store_true', help="measure generation throughput")
+    parser.add_argument('--count', type=int, default=10000, help="blocks per N level")
+    parser.add_argument('--trials', type=int, default=30, help="trials per block")
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 3, 4, 5], help="N levels")
+    parser.add_argument('--targets', type=float, default=0.2, help="target percentage")
+    parser.add_argument('--letters', type=int, default=10, help="alphabet size")
+    parser.add_argument('--seed', default='pilot', help="seed word or integer")
+    args = parser.parse_args()
+    for n in args.levels:
+        needed = len(_excluded_lags(n, True, 2)) + 1
+        if args.letters < needed:
+            parser.error(f"{n}-back needs --letters {needed} or more")
+
+    if args.benchmark:
+        results = benchmark(args.count, args.trials, args.levels, args.targets, args.letters)
+        print(f"{args.count} blocks x {len(args.levels)} levels, {args.trials} trials each")
+        for name, rate in results.items():
+            print(f"  {name:<7} {rate:12,.0f} blocks/s")
+        print(f"  speedup {results['numpy'] / results['python']:.1f}x "
+              f"(the python baseline is manifest.generate_blocks, without lure or run constraints)")
+        return
+
+    seed = int(args.seed) if args.seed.isdigit() else args.seed
+    for n in args.levels:
+        letters, targets = generate_sequences(n, args.trials, args.count, args.targets,
+                                              args.letters, seed=f"{seed}-{n}")
+        print(f"{n}-back: {args.count} blocks, "
+              f"{count_violations(letters, targets, n)} constraint violations")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+# nback_core/session.py
+from .journal import TRIAL, BLOCK
+from .scoring import SessionStats
+from .timeline import BANNER, ONSET, OFFSET, BLOCK_END, compile_timeline
+from .timing import interval_ms
+
+
+class TrialSession:
+    """The main experiment's trial loop, independent of Tk.
+
+    Each trial is an onset event (show the letter, start accepting a
+    response) and an offset event (show the fixation dot, record the trial),
+    and each block ends with a banner for the next one. The blocks are
+    compiled into a Timeline (nback_core.timeline) up front, or one is passed
+    in, and the session just steps through it: each event is run at its
+    absolute deadline by the scheduler, with everything it needs already in
+    the table. A key press is passed in through press(). The front end
+    supplies the collaborators:
+
+    - clock: now() in ns and to_epoch_ms(), e.g. a SessionClock
+    - scheduler: at(deadline_ns, callback, label) and idle(callback)
+    - display: show_banner(text), show_stimulus(letter), show_fixation()
+
+    The GUI passes Tk-backed ones; nback_core.simulate passes a virtual clock and
+    scheduler, so simulated sessions run exactly this code. Completed trials
+    are appended to `store` (a TrialStore) and to the journal, if any.
+
+    `stats` keeps running per-block performance (nback_core.scoring), updated
+    as each trial is recorded; a block's summary is journaled when it ends.
+    on_trial(block_stats) and on_block_end(summary) are called from idle time,
+    after the trial's timed work.
+    """
+
+    def __init__(self, blocks, clock, scheduler, display, store, journal=None,
+                 banner_ms=1500, stimulus_ms=500, iti_ms=1500, segment=0, timeline=None,
+                 on_finish=None, on_onset=None, on_trial=None, on_block_end=None,
+                 debug=False):
+        self.blocks = blocks
+        self.timeline = timeline or compile_timeline(blocks, banner_ms, stimulus_ms, iti_ms)
+        self.clock = clock
+        self.scheduler = scheduler
+        self.display = display
+        self.store = store
+        self.journal = journal
+        self.segment = segment
+        self.on_finish = on_finish
+        self.on_onset = on_onset  # Called as on_onset(block, trial, onset_ns) after each onset
+        self.on_trial = on_trial
+        self.on_block_end = on_block_end
+        self.debug = debug
+
+        self.block_index = 0
+        self.trial_index = 0
+        self.position = 0  # Index of the next timeline event
+        self.start_ns = None  # Clock time of the timeline's time 0
+        self._handlers = {}
+        self.onset_ns = None
+        self.press_ns = None
+        self.press_callback_ns = None
+        self.accepting = False  # True while a stimulus is shown
+        self.finished = False
+        self.stats = SessionStats.from_store(store)  # Includes trials from before a resume
+
+    def start(self, block_index=0, trial_index=0, resumed=False):
+        """Show the first banner and schedule the session from now on"""
+        self.block_index, self.trial_index = block_index, trial_index
+        # Looked up here rather than per event, after any instrumentation has wrapped them
+        self._handlers = {BANNER: self._banner, ONSET: self._onset, OFFSET: self._offset,
+                          BLOCK_END: self._block_end}
+        self.position = self.timeline.onset_index(block_index, trial_index)
+        first = self.timeline[self.position]
+        banner = "Resuming" if resumed else "Starting"
+        self.display.show_banner(f"{banner} {first.block_n}-back...")
+        # The first onset is one banner from now; every later event keeps its time relative to it
+        self.start_ns = self.clock.now() + self.timeline.banner_ns - first.time_ns
+        self._schedule()
+
+    def press(self, t_ns=None, callback_ns=None):
+        """Record a response at t_ns (default now); returns True if it counted.
+
+        t_ns is when the key was pressed (e.g. from the event's timestamp) and
+        callback_ns when the handler saw it; both default to now. Only the
+        first press while a stimulus is shown counts.
+        """
+        if not self.accepting or self.press_ns is not None:
+            return False
+        now = self.clock.now()
+        if t_ns is not None and t_ns < self.onset_ns:
+            return False  # Pressed before the stimulus appeared, handled after
+        self.press_ns = now if t_ns is None else t_ns
+        self.press_callback_ns = now if callback_ns is None else callback_ns
+        return True
+
+    def _schedule(self):
+        event = self.timeline[self.position]
+        self.scheduler.at(self.start_ns + event.time_ns, self._step,
+                          (event.kind, event.block_index, event.trial_index))
+
+    def _step(self):
+        """Run the due event (and any others at the same time), then schedule the next"""
+        events = self.timeline.events
+        time_ns = events[self.position].time_ns
+        while self.position < len(events) and events[self.position].time_ns == time_ns:
+            event = events[self.position]
+            self.position += 1
+            self._handlers[event.kind](event)
+        # The next event is at a fixed deadline, however late this ran
+        if self.position < len(events):
+            self._schedule()
+        else:
+            self.finished = True
+            if self.on_finish:
+                self.on_finish()
+
+    def _onset(self, event):
+        if self.debug:
+            print(f"Block: {event.block_index}/{len(self.blocks)}, Trial: {event.trial_index}")
+        self.display.show_stimulus(event.letter)
+        # Response recording begins right after the stimulus is shown
+        self.onset_ns = self.clock.now()
+        self.press_ns = self.press_callback_ns = None
+        self.accepting = True
+        self.block_index, self.trial_index = event.block_index, event.trial_index
+        if self.on_onset:
+            block = self.blocks[event.block_index]
+            self.on_onset(block, block['trials'][event.trial_index], self.onset_ns)
+
+    def _offset(self, event):
+        self.accepting = False
+        self.display.show_fixation()
+        offset_ns = self.clock.now()
+
+        # Times are absolute (ms since epoch); accuracy and timestamp are derived on export
+        clock = self.clock
+        pressed = self.press_ns is not None
+        rt = interval_ms(self.onset_ns, self.press_ns)
+        self.store.append(event.block_index, event.block_n, event.trial_index, event.letter,
+                          event.is_target, pressed, rt,
+                          clock.to_epoch_ms(self.onset_ns), clock.to_epoch_ms(self.press_ns),
+                          clock.to_epoch_ms(offset_ns), self.segment,
+                          interval_ms(self.onset_ns, self.press_callback_ns))
+        block_stats = self.stats.add(event.block_index, event.block_n, event.is_target, pressed, rt)
+        if self.journal:
+            self.journal.append(TRIAL, **self.store.record(-1))
+            # Write after this deadline's work is done
+            self.scheduler.idle(self.journal.maybe_flush)
+        if self.on_trial:
+            self.scheduler.idle(lambda: self.on_trial(block_stats))
+        self.trial_index = event.trial_index + 1
+
+    def _block_end(self, event):
+        block_stats = self.stats.block(event.block_index)
+        if block_stats is not None:
+            summary = block_stats.summary()
+            if self.journal:
+                self.journal.append(BLOCK, **summary)
+            if self.on_block_end:
+                self.scheduler.idle(lambda: self.on_block_end(summary))
+        self.block_index, self.trial_index = event.block_index + 1, 0
+
+    def _banner(self, event):
+        self.display.show_banner(event.text)
+        if self.journal:
+            self.journal.flush()  # Nothing is timed during the block banner
@@ -0,0 +1,225 @@
+# nback_core/simulate.py
+"""Headless simulation of the main experiment.
+
+Runs the real trial loop (nback_core.session.TrialSession) on a virtual clock,
+with a simulated participant pressing space, so a full session takes
+milliseconds and needs no display. Run as a script to simulate many
+sessions across a process pool:
+
+    python -m nback_core.simulate --sessions 1000 --processes 8
+"""
+import argparse
+import heapq
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .config import (STIMULUS_DURATION, ITI_DURATION, BLOCK_BANNER_DURATION,
+                     EXPERIMENT_TRIALS, N_LEVELS, LETTERS, NUM_VERSIONS)
+from .journal import COMPLETE, start_journal, read_journal
+from .manifest import generate_version
+from .scoring import score
+from .session import TrialSession
+from .store import TrialStore, export_journal
+from .timing import SessionClock
+
+
+class VirtualClock(SessionClock):
+    """SessionClock whose time only moves when the scheduler advances it"""
+
+    def __init__(self, start_wall_ns=None):
+        self.anchor_ns = 0
+        self.anchor_wall_ns = time.time_ns() if start_wall_ns is None else start_wall_ns
+        self.anchor_uncertainty_ns = 0
+        self.t_ns = 0
+
+    def now(self):
+        return self.t_ns
+
+
+class VirtualScheduler:
+    """Runs scheduled events in deadline order, jumping the clock to each one.
+
+    latency is an optional function returning how many ns late an event
+    fires, to model a busy event loop. Fired events are logged like
+    DeadlineScheduler's.
+    """
+
+    def __init__(self, clock, latency=None):
+        self.clock = clock
+        self.latency = latency
+        self.log = []
+        self._queue = []
+        self._idle = []
+        self._seq = 0
+
+    def at(self, deadline_ns, callback, label=None):
+        self._seq += 1
+        heapq.heappush(self._queue, (deadline_ns, self._seq, callback, label))
+        return self._seq
+
+    def idle(self, callback):
+        self._idle.append(callback)
+
+    def cancel_all(self):
+        self._queue.clear()
+        self._idle.clear()
+
+    def run(self):
+        """Run events until none are left"""
+        while self._queue:
+            deadline_ns, _, callback, label = heapq.heappop(self._queue)
+            actual_ns = deadline_ns + (self.latency() if self.latency else 0)
+            self.clock.t_ns = max(self.clock.t_ns, actual_ns)
+            if label is not None:
+                self.log.append((label, deadline_ns, self.clock.t_ns, self.clock.t_ns - deadline_ns))
+            callback()
+            while self._idle:
+                self._idle.pop(0)()
+
+
+class NullDisplay:
+    """Display that only remembers what would be on screen"""
+
+    def __init__(self):
+        self.text = ""
+
+    def show_banner(self, text):
+        self.text = text
+
+    def show_stimulus(self, letter):
+        self.text = letter
+
+    def show_fixation(self):
+        self.text = "•"
+
+
+class ScriptedResponder:
+    """Replays a fixed list of reaction times (ms, or None for no press), one per trial"""
+
+    def __init__(self, rts):
+        self.rts = iter(rts)
+
+    def respond(self, block, trial):
+        return next(self.rts, None)
+
+
+class ProbabilisticResponder:
+    """Presses for targets with probability hit_rate and for non-targets with
+    false_alarm_rate, after a normally distributed reaction time"""
+
+    def __init__(self, hit_rate=0.8, false_alarm_rate=0.1, rt_mean_ms=400, rt_sd_ms=80,
+                 min_rt_ms=150, seed=None):
+        self.hit_rate = hit_rate
+        self.false_alarm_rate = false_alarm_rate
+        self.rt_mean_ms = rt_mean_ms
+        self.rt_sd_ms = rt_sd_ms
+        self.min_rt_ms = min_rt_ms
+        self.rng = random.Random(seed)
+
+    def respond(self, block, trial):
+        p = self.hit_rate if trial['is_target'] else self.false_alarm_rate
+        if self.rng.random() >= p:
+            return None
+        return max(self.min_rt_ms, self.rng.gauss(self.rt_mean_ms, self.rt_sd_ms))
+
+
+def simulate_session(version=1, responder=None, participant_id='sim', blocks=None,
+                     out_dir=None, latency=None):
+    """Run one full session headlessly; returns (TrialStore, VirtualScheduler).
+
+    Presses later than the stimulus duration arrive after the offset and are
+    ignored, as in the GUI. With out_dir, the session is journaled there and
+    its CSV written from the journal, the same way save_data() does it.
+    """
+    if blocks is None:
+        blocks = generate_version(version)
+    responder = responder or ProbabilisticResponder(seed=f"{participant_id}-{version}")
+
+    clock = VirtualClock()
+    scheduler = VirtualScheduler(clock, latency)
+    store = TrialStore(participant_id, version, LETTERS)
+    journal = None
+    if out_dir is not None:
+        journal = start_journal(Path(out_dir) / f"nback_{participant_id}_v{version}.jsonl",
+                                participant_id=participant_id, version=version,
+                                anchor_wall_ns=clock.anchor_wall_ns,
+                                started=clock.to_timestamp(clock.now()))
+
+    def on_onset(block, trial, onset_ns):
+        rt_ms = responder.respond(block, trial)
+        if rt_ms is not None:
+            press_ns = onset_ns + int(rt_ms * 1_000_000)
+            scheduler.at(press_ns, lambda: session.press(press_ns))
+
+    session = TrialSession(blocks, clock, scheduler, NullDisplay(), store, journal,
+                           banner_ms=BLOCK_BANNER_DURATION * 1000,
+                           stimulus_ms=STIMULUS_DURATION * 1000,
+                           iti_ms=ITI_DURATION * 1000, on_onset=on_onset)
+    session.start()
+    scheduler.run()
+
+    if journal is not None:
+        journal.append(COMPLETE)
+        journal.close()
+        export_journal(read_journal(journal.path), out_dir, participant_id, version, LETTERS)
+    return store, scheduler
+
+
+def _run_job(job):
+    """One pool task: simulate a session and return its summary"""
+    index, version, hit_rate, false_alarm_rate, seed, out_dir = job
+    participant_id = f"sim{index:05d}"
+    responder = ProbabilisticResponder(hit_rate, false_alarm_rate, seed=f"{seed}-{index}")
+    store, _ = simulate_session(version, responder, participant_id, out_dir=out_dir)
+    return score(store)
+
+
+def run_batch(sessions, processes=None, hit_rate=0.8, false_alarm_rate=0.1, seed=0,
+              out_dir=None):
+    """Simulate many sessions across a process pool, cycling through the versions.
+
+    Returns the list of per-session summaries.
+    """
+    jobs = [(i, i % NUM_VERSIONS + 1, hit_rate, false_alarm_rate, seed, out_dir)
+            for i in range(sessions)]
+    if processes == 1:
+        return [_run_job(job) for job in jobs]
+    processes = processes or os.cpu_count()
+    with ProcessPoolExecutor(processes) as pool:
+        return list(pool.map(_run_job, jobs, chunksize=max(1, sessions // (processes * 4))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate n-back sessions without a display")
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--processes', type=int, default=None, help="default: one per CPU")
+    parser.add_argument('--hit-rate', type=float, default=0.8)
+    parser.add_argument('--fa-rate', type=float, default=0.1)
+    parser.add_argument('--seed', default='0')
+    parser.add_argument('--out', default=None, help="directory for journals and CSVs")
+    args = parser.parse_args()
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    start = time.perf_counter()
+    summaries = run_batch(args.sessions, args.processes, args.hit_rate, args.fa_rate,
+                          args.seed, args.out)
+    elapsed = time.perf_counter() - start
+
+    expected = EXPERIMENT_TRIALS * len(N_LEVELS)
+    incomplete = sum(1 for s in summaries if s['trials'] != expected)
+    totals = {key: sum(s[key] for s in summaries)
+              for key in ("hits", "misses", "false_alarms", "correct_rejections")}
+    targets = totals['hits'] + totals['misses']
+    non_targets = totals['false_alarms'] + totals['correct_rejections']
+    print(f"{len(summaries)} sessions in {elapsed:.2f} s ({len(summaries) / elapsed:,.0f} sessions/s)")
+    print(f"hit rate {totals['hits'] / targets:.3f}, "
+          f"false-alarm rate {totals['false_alarms'] / non_targets:.3f}, "
+          f"{incomplete} sessions with other than {expected} trials")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+# nback_core/speech.py
+import hashlib
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+from collections import deque
+from pathlib import Path
+
+SAY = 'say'
+STOP = 'stop'
+REPLACE = 'replace'
+SHUTDOWN = 'shutdown'
+
+POLL_INTERVAL = 0.01  # seconds between checks of the command queue while speaking
+
+
+class NarrationCache:
+    """Directory of pre-rendered narration audio, one file per text.
+
+    Files are named by a hash of (voice, rate, text), so changing any of the
+    three simply produces a different name: sync() renders whatever is missing
+    and deletes files that no longer belong to any current narration.
+    """
+
+    def __init__(self, cache_dir, rate, voice=None):
+        self.cache_dir = Path(cache_dir)
+        self.rate = rate
+        self.voice = voice
+
+    def path_for(self, text):
+        key = f"{self.voice or 'default'}\0{self.rate}\0{text}".encode('utf-8')
+        return self.cache_dir / f"{hashlib.sha256(key).hexdigest()[:24]}.wav"
+
+    def lookup(self, text):
+        """Cached audio file for text, or None if it has not been rendered"""
+        path = self.path_for(text)
+        return path if path.exists() else None
+
+    def missing(self, texts):
+        return [text for text in texts if not self.lookup(text)]
+
+    def sync(self, texts, engine_factory):
+        """Render missing texts with pyttsx3's save_to_file and prune stale files.
+
+        engine_factory is only called if something actually needs rendering.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        wanted = {self.path_for(text).name for text in texts}
+        for path in self.cache_dir.glob('*.wav'):
+            if path.name not in wanted:
+                path.unlink()
+
+        todo = self.missing(texts)
+        if not todo:
+            return
+        engine = engine_factory()
+        renders = []
+        for text in todo:
+            path = self.path_for(text)
+            tmp_path = path.with_suffix('.tmp.wav')
+            engine.save_to_file(text, str(tmp_path))
+            renders.append((tmp_path, path))
+        engine.runAndWait()
+        # Only publish complete renders, so a crash mid-build never leaves a truncated file
+        for tmp_path, path in renders:
+            if tmp_path.exists() and tmp_path.stat().st_size > 0:
+                os.replace(tmp_path, path)
+
+
+class AudioPlayer:
+    """Play audio files asynchronously with the platform's native player"""
+
+    def __init__(self):
+        self._process = None
+        self._command = None
+        self._ends_at = 0.0
+        if sys.platform == 'darwin':
+            self._command = ['afplay']
+        elif sys.platform != 'win32':
+            for player in (['paplay'], ['aplay', '-q']):
+                if shutil.which(player[0]):
+                    self._command = player
+                    break
+
+    @property
+    def available(self):
+        return sys.platform == 'win32' or self._command is not None
+
+    def play(self, path):
+        self.stop()
+        if sys.platform == 'win32':
+            import winsound
+            winsound.PlaySound(str(path), winsound.SND_FILENAME | winsound.SND_ASYNC)
+            self._process = path
+            # winsound cannot be polled, so work out when playback ends instead
+            with wave.open(str(path)) as w:
+                self._ends_at = time.monotonic() + w.getnframes() / w.getframerate()
+        else:
+            self._process = subprocess.Popen(self._command + [str(path)],
+                                             stdout=subprocess.DEVNULL,
+                                             stderr=subprocess.DEVNULL)
+
+    def is_playing(self):
+        if self._process is None:
+            return False
+        if sys.platform == 'win32':
+            return time.monotonic() < self._ends_at
+        return self._process.poll() is None
+
+    def stop(self):
+        if self._process is None:
+            return
+        if sys.platform == 'win32':
+            import winsound
+            winsound.PlaySound(None, winsound.SND_PURGE)
+        elif self._process.poll() is None:
+            self._process.terminate()
+        self._process = None
+
+
+class SpeechWorker(threading.Thread):
+    """Narrate text on a dedicated thread so the Tk event loop never blocks.
+
+    Texts with a rendered file in the NarrationCache are played straight from
+    disk. Anything else is synthesized live with a pyttsx3 engine driven by its
+    external run loop (startLoop(False) + iterate()). Either way, pending
+    commands are checked every POLL_INTERVAL, so a stop or replace cuts the
+    current utterance off immediately. The engine is only created when a text
+    is missing from the cache, so a warm cache never initializes TTS at all
+    (pyttsx3 itself is not even imported until then).
+
+    Commands (safe to call from any thread):
+        say(text)      queue text after anything already being spoken
+        stop()         stop speaking and drop anything queued
+        replace(text)  stop, then speak text
+        shutdown()     stop and end the thread
+    """
+
+    def __init__(self, rate=150, voice=None, cache=None, prerender=(), on_timing=None, debug=False):
+        super().__init__(name="SpeechWorker", daemon=True)
+        self.rate = rate
+        self.voice = voice
+        self.cache = cache
+        self.prerender = list(prerender)
+        self.on_timing = on_timing  # called with (phase, duration_ns) for TTS init/rendering
+        self.debug = debug
+        self.available = True
+        self._commands = queue.Queue()
+        self._engine = None
+        self._looping = False
+        self._player = AudioPlayer()
+
+    def say(self, text):
+        self._commands.put((SAY, text))
+
+    def stop(self):
+        self._commands.put((STOP, None))
+
+    def replace(self, text):
+        self._commands.put((REPLACE, text))
+
+    def shutdown(self):
+        self._commands.put((SHUTDOWN, None))
+
+    def _get_engine(self):
+        if self._engine is None:
+            start_ns = time.perf_counter_ns()
+            import pyttsx3  # Deferred: slow to import and only needed on a cache miss
+            engine = pyttsx3.init()
+            engine.setProperty('rate', self.rate)
+            if self.voice:
+                engine.setProperty('voice', self.voice)
+            self._engine = engine
+            self._report_timing("tts_init", start_ns)
+        return self._engine
+
+    def _report_timing(self, phase, start_ns):
+        if self.on_timing:
+            self.on_timing(phase, time.perf_counter_ns() - start_ns)
+
+    def _live_engine(self):
+        """Engine with its external loop running, ready for say()/iterate()"""
+        engine = self._get_engine()
+        if not self._looping:
+            engine.startLoop(False)
+            self._looping = True
+        return engine
+
+    def _start(self, text):
+        path = self.cache.lookup(text) if self.cache and self._player.available else None
+        if path:
+            self._player.play(path)
+        else:
+            self._live_engine().say(text)
+
+    def _is_busy(self):
+        return self._player.is_playing() or (self._looping and self._engine.isBusy())
+
+    def _iterate(self):
+        if self._looping:
+            self._engine.iterate()
+
+    def _stop(self):
+        self._player.stop()
+        if self._looping:
+            self._engine.stop()
+
+    def run(self):
+        if self.cache and self.prerender:
+            try:
+                start_ns = time.perf_counter_ns()
+                self.cache.sync(self.prerender, self._get_engine)
+                self._report_timing("narration_cache", start_ns)
+            except Exception as e:
+                if self.debug:
+                    print(f"Narration cache error: {str(e)}")
+
+        pending = deque()
+        try:
+            while True:
+                busy = self._is_busy()
+                if not busy and pending:
+                    self._start(pending.popleft())
+                    busy = True
+
+                # Block while idle; while speaking, only wait one poll interval
+                try:
+                    command, text = self._commands.get(timeout=POLL_INTERVAL if busy else None)
+                except queue.Empty:
+                    self._iterate()
+                    continue
+
+                if command == SHUTDOWN:
+                    self._stop()
+                    break
+                if command in (STOP, REPLACE):
+                    pending.clear()
+                    self._stop()
+                if command in (SAY, REPLACE):
+                    pending.append(text)
+                self._iterate()
+        except Exception as e:
+            # Keep draining commands so callers never have to check availability
+            self.available = False
+            print(f"TTS initialization failed: {e}" if self._engine is None else f"TTS Error: {e}")
+            while self._commands.get()[0] != SHUTDOWN:
+                pass
+        finally:
+            if self._looping:
+                try:
+                    self._engine.endLoop()
+                except Exception:
+                    pass
@@ -0,0 +1,121 @@
+# nback_core/stats.py
+import math
+from bisect import bisect_right
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+# Bin edges in ms for latency histograms: fine below a frame, coarse above
+LATENCY_EDGES_MS = (0, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+def percentile(sorted_values, q):
+    """q-th percentile (0-100) of already sorted values, linearly interpolated"""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+class Histogram:
+    """Fixed-size histogram: counts per bin plus count, sum, min and max.
+
+    Bin 0 counts values below edges[0], bin i values in [edges[i-1], edges[i])
+    and the last bin values >= edges[-1]. add() is O(log bins) and memory
+    does not grow with the number of values.
+    """
+
+    def __init__(self, edges=LATENCY_EDGES_MS):
+        self.edges = tuple(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.counts[bisect_right(self.edges, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, q):
+        """Estimate of the q-th percentile: upper edge of the bin that reaches it"""
+        if not self.count:
+            return None
+        target = self.count * q / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                if i == 0:
+                    return self.min
+                return min(self.edges[i], self.max) if i < len(self.edges) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "percentiles": {f"p{q:g}": self.percentile(q) for q in PERCENTILES},
+            "histogram": {"edges": list(self.edges), "counts": list(self.counts)},
+        }
+
+
+def summarize(samples, edges=LATENCY_EDGES_MS):
+    """Exact percentiles and a histogram of a list of samples, as a dict"""
+    values = sorted(samples)
+    hist = Histogram(edges)
+    for v in values:
+        hist.add(v)
+    n = len(values)
+    mean = sum(values) / n if n else None
+    return {
+        "count": n,
+        "mean": mean,
+        "stdev": math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1)) if n > 1 else None,
+        "min": values[0] if n else None,
+        "max": values[-1] if n else None,
+        "percentiles": {f"p{q:g}": percentile(values, q) for q in PERCENTILES},
+        "histogram": {"edges": list(edges), "counts": hist.counts},
+    }
+
+
+class RunningStats:
+    """Streaming count, mean and variance (Welford's algorithm), O(1) per value"""
+
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def variance(self):
+        """Sample variance, or None with fewer than two values"""
+        return self._m2 / (self.count - 1) if self.count > 1 else None
+
+    def stdev(self):
+        variance = self.variance()
+        return math.sqrt(variance) if variance is not None else None
@@ -0,0 +1,222 @@
+# nback_core/store.py
+import csv
+import math
+import time
+from array import array
+from pathlib import Path
+
+from .journal import TRIAL, BLOCK, atomic_write
+
+# CSV header, in column order; new columns go at the end so existing positions never move
+CSV_FIELDS = [
+    "Participant ID", "Version", "Block N", "Trial Index",
+    "Stimulus Letter", "Is Target", "Response", "Accuracy",
+    "Reaction Time (ms)", "Stimulus Onset (ms)", "Response Time (ms)",
+    "Timestamp", "Segment", "Callback RT (ms)", "Stimulus Offset (ms)"
+]
+
+# Block summary CSV header, and the summary dict key of each column (see scoring.BlockStats)
+BLOCK_SUMMARY_FIELDS = [
+    ("Block Index", "block_index"), ("Block N", "block_n"), ("Trials", "trials"),
+    ("Hits", "hits"), ("Misses", "misses"), ("False Alarms", "false_alarms"),
+    ("Correct Rejections", "correct_rejections"), ("Hit Rate", "hit_rate"),
+    ("False Alarm Rate", "false_alarm_rate"), ("d'", "d_prime"),
+    ("RT Mean (ms)", "rt_mean"), ("RT SD (ms)", "rt_sd"),
+]
+
+NAN = float('nan')
+
+
+def _opt(value):
+    """None -> NaN for float columns"""
+    return NAN if value is None else value
+
+
+def _unopt(value):
+    """NaN -> None when reading float columns back"""
+    return None if math.isnan(value) else value
+
+
+class TrialStore:
+    """Columnar in-memory store of one session's trials.
+
+    Each field is a typed array column instead of a dict per trial: letters
+    are interned as one-byte codes into `letters`, booleans are one byte each
+    in a bytearray, and times are float64 with NaN for "no response".
+    Participant ID and version are the same for every trial and stored once.
+    Accuracy and the human-readable timestamp are derived on export.
+
+    rt is measured from the key event's own timestamp; callback_rt from when
+    the key handler ran, so callback_rt - rt is the event dispatch delay.
+    """
+
+    def __init__(self, participant_id, version, letters=()):
+        self.participant_id = participant_id
+        self.version = version
+        self.letters = list(letters)
+        self._letter_codes = {letter: i for i, letter in enumerate(self.letters)}
+
+        self.block_index = array('H')
+        self.block_n = array('H')
+        self.trial_index = array('I')
+        self.letter = array('B')
+        self.is_target = bytearray()
+        self.response = bytearray()
+        self.rt = array('d')
+        self.stimulus_onset = array('d')
+        self.response_time = array('d')
+        self.stimulus_offset = array('d')
+        self.segment = array('H')
+        self.callback_rt = array('d')
+
+    def __len__(self):
+        return len(self.trial_index)
+
+    def _code(self, letter):
+        code = self._letter_codes.get(letter)
+        if code is None:
+            code = self._letter_codes[letter] = len(self.letters)
+            self.letters.append(letter)
+        return code
+
+    def append(self, block_index, block_n, trial_index, stimulus_letter, is_target, response,
+               rt, stimulus_onset, response_time, stimulus_offset, segment=0, callback_rt=None):
+        self.block_index.append(block_index)
+        self.block_n.append(block_n)
+        self.trial_index.append(trial_index)
+        self.letter.append(self._code(stimulus_letter))
+        self.is_target.append(bool(is_target))
+        self.response.append(bool(response))
+        self.rt.append(_opt(rt))
+        self.stimulus_onset.append(_opt(stimulus_onset))
+        self.response_time.append(_opt(response_time))
+        self.stimulus_offset.append(_opt(stimulus_offset))
+        self.segment.append(segment)
+        self.callback_rt.append(_opt(callback_rt))
+
+    @classmethod
+    def from_records(cls, records, participant_id=None, version=None, letters=()):
+        """Build a store from trial dicts, e.g. journal records"""
+        records = list(records)
+        if records:
+            participant_id = records[0]['participant_id'] if participant_id is None else participant_id
+            version = records[0]['version'] if version is None else version
+        store = cls(participant_id, version, letters)
+        for r in records:
+            store.append(r['block_index'], r['block_n'], r['trial_index'], r['stimulus_letter'],
+                         r['is_target'], r['response'], r['rt'], r['stimulus_onset'],
+                         r['response_time'], r['stimulus_offset'], r.get('segment', 0),
+                         r.get('callback_rt'))
+        return store
+
+    def record(self, i):
+        """Trial i as a dict (the journal's record format)"""
+        is_target = bool(self.is_target[i])
+        response = bool(self.response[i])
+        onset = _unopt(self.stimulus_onset[i])
+        return {
+            "participant_id": self.participant_id,
+            "version": self.version,
+            "block_index": self.block_index[i],
+            "block_n": self.block_n[i],
+            "trial_index": self.trial_index[i],
+            "stimulus_letter": self.letters[self.letter[i]],
+            "is_target": is_target,
+            "response": response,
+            "accuracy": is_target == response,
+            "rt": _unopt(self.rt[i]),
+            "stimulus_onset": onset,
+            "response_time": _unopt(self.response_time[i]),
+            "stimulus_offset": _unopt(self.stimulus_offset[i]),
+            "timestamp": _timestamp(onset),
+            "segment": self.segment[i],
+            "callback_rt": _unopt(self.callback_rt[i]),
+        }
+
+    def csv_rows(self):
+        """Rows in CSV_FIELDS order, straight from the columns"""
+        letters = self.letters
+        for (block_n, trial_index, code, is_target, response, rt, onset, response_time,
+             offset, segment, callback_rt) in zip(self.block_n, self.trial_index, self.letter,
+                                                  self.is_target, self.response, self.rt,
+                                                  self.stimulus_onset, self.response_time,
+                                                  self.stimulus_offset, self.segment,
+                                                  self.callback_rt):
+            yield [self.participant_id, self.version, block_n, trial_index, letters[code],
+                   bool(is_target), bool(response), is_target == response,
+                   _csv_float(rt), _csv_float(onset), _csv_float(response_time),
+                   _timestamp(_unopt(onset)), segment, _csv_float(callback_rt),
+                   _csv_float(offset)]
+
+    def to_numpy(self):
+        """Columns as a dict of NumPy arrays (copies, so the store can keep growing)"""
+        import numpy as np
+
+        is_target = np.frombuffer(self.is_target, dtype=np.bool_).copy()
+        response = np.frombuffer(self.response, dtype=np.bool_).copy()
+        return {
+            "block_index": np.array(self.block_index, dtype=np.uint16),
+            "block_n": np.array(self.block_n, dtype=np.uint16),
+            "trial_index": np.array(self.trial_index, dtype=np.uint32),
+            "stimulus_letter": np.array(self.letters)[np.array(self.letter, dtype=np.uint8)]
+                               if len(self) else np.array([], dtype=str),
+            "is_target": is_target,
+            "response": response,
+            "accuracy": is_target == response,
+            "rt": np.array(self.rt, dtype=np.float64),
+            "stimulus_onset": np.array(self.stimulus_onset, dtype=np.float64),
+            "response_time": np.array(self.response_time, dtype=np.float64),
+            "stimulus_offset": np.array(self.stimulus_offset, dtype=np.float64),
+            "segment": np.array(self.segment, dtype=np.uint16),
+            "callback_rt": np.array(self.callback_rt, dtype=np.float64),
+        }
+
+
+def write_csv(path, trials):
+    """Write a TrialStore to a session CSV, atomically"""
+    with atomic_write(path) as f:
+        # Segment is 0 for the original run, +1 after each crash/quit and resume
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows(trials.csv_rows())
+
+
+def write_block_summaries(path, summaries):
+    """Write per-block performance summaries to CSV, atomically"""
+    with atomic_write(path) as f:
+        writer = csv.writer(f)
+        writer.writerow([header for header, _ in BLOCK_SUMMARY_FIELDS])
+        for summary in summaries:
+            writer.writerow(['' if summary.get(key) is None else summary[key]
+                             for _, key in BLOCK_SUMMARY_FIELDS])
+
+
+def export_journal(records, directory, participant_id, version, letters=()):
+    """Write a session's CSV and block summary CSV from its journal records.
+
+    Returns the session CSV's path; raises ValueError if there are no trials.
+    """
+    directory = Path(directory)
+    trials = [r for r in records if r['type'] == TRIAL]
+    if not trials:
+        raise ValueError("No data to save")
+    path = directory / f"nback_{participant_id}_v{version}.csv"
+    write_csv(path, TrialStore.from_records(trials, participant_id, version, letters))
+
+    # One summary per block (the last one, should a block have been journaled twice)
+    summaries = {r['block_index']: r for r in records if r['type'] == BLOCK}
+    if summaries:
+        write_block_summaries(directory / f"nback_{participant_id}_v{version}_blocks.csv",
+                              [summaries[i] for i in sorted(summaries)])
+    return path
+
+
+def _csv_float(value):
+    """Empty cell for NaN, like csv writes None"""
+    return '' if math.isnan(value) else value
+
+
+def _timestamp(onset_ms):
+    if onset_ms is None:
+        return ''
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(onset_ms / 1000))
@@ -0,0 +1,139 @@
+# nback_core/timeline.py
+"""A session compiled ahead of time into a flat, immutable table of events.
+
+Every block banner, stimulus onset, stimulus offset (which starts the ITI)
+and block end of a session is one TimelineEvent. Each event carries its time
+from the session start, how long it lasts until the next event, and
+everything needed to run it: the letter, whether it is a target and so the
+expected response. TrialSession only steps through the table, so per-event
+work is the same small, constant amount. check() validates the whole
+schedule before the participant starts (see also nback_experiment.py
+--check-schedules and --export-schedule).
+"""
+import csv
+from collections import namedtuple
+
+from .config import BLOCK_BANNER_DURATION, STIMULUS_DURATION, ITI_DURATION
+from .journal import atomic_write
+
+BANNER = 'banner'
+ONSET = 'onset'
+OFFSET = 'offset'
+BLOCK_END = 'block_end'
+
+TimelineEvent = namedtuple('TimelineEvent', [
+    'kind', 'time_ns', 'duration_ns', 'block_index', 'block_n', 'trial_index',
+    'letter', 'is_target', 'expected_response', 'text'])
+
+TIMELINE_FIELDS = ["Event", "Time (ms)", "Duration (ms)", "Block Index", "Block N", "Trial Index",
+                   "Letter", "Is Target", "Expected Response", "Text"]
+
+
+class Timeline:
+    """The events of a session in time order (a tuple of TimelineEvents).
+
+    Times are ns from the start of the first banner. A block ends one ITI
+    after its last offset, and the next block's banner starts at the same
+    time, so those two events share a time.
+    """
+
+    def __init__(self, events, banner_ns, stimulus_ns, iti_ns):
+        self.events = tuple(events)
+        self.banner_ns = banner_ns
+        self.stimulus_ns = stimulus_ns
+        self.iti_ns = iti_ns
+        self._onsets = {(e.block_index, e.trial_index): i
+                        for i, e in enumerate(self.events) if e.kind == ONSET}
+
+    def __len__(self):
+        return len(self.events)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __getitem__(self, index):
+        return self.events[index]
+
+    def onset_index(self, block_index, trial_index):
+        """Index of the onset event of a trial (where a session starts or resumes)"""
+        return self._onsets[(block_index, trial_index)]
+
+    def duration_ms(self):
+        return self.events[-1].time_ns / 1_000_000 if self.events else 0.0
+
+    def check(self, blocks=None):
+        """Problems with the schedule, as messages; empty if it is sound.
+
+        With blocks, also checks that the timeline presents exactly their
+        trials, in order.
+        """
+        problems = []
+        durations = {BANNER: self.banner_ns, ONSET: self.stimulus_ns, OFFSET: self.iti_ns,
+                     BLOCK_END: 0}
+        previous = None
+        for i, event in enumerate(self.events):
+            where = f"event {i} ({event.kind}, block {event.block_index}, trial {event.trial_index})"
+            if event.kind not in durations:
+                problems.append(f"{where}: unknown event kind")
+                continue
+            if event.duration_ns != durations[event.kind]:
+                problems.append(f"{where}: lasts {event.duration_ns}ns, "
+                                f"expected {durations[event.kind]}ns")
+            if previous is not None and event.time_ns != previous.time_ns + previous.duration_ns:
+                problems.append(f"{where}: starts at {event.time_ns}ns, "
+                                f"expected {previous.time_ns + previous.duration_ns}ns")
+            if event.kind in (ONSET, OFFSET) and event.expected_response != event.is_target:
+                problems.append(f"{where}: expected response does not match the target")
+            if event.kind == OFFSET and (previous is None or previous.kind != ONSET or
+                                         previous[3:6] != event[3:6]):
+                problems.append(f"{where}: not preceded by its onset")
+            previous = event
+        if previous is not None and previous.kind != BLOCK_END:
+            problems.append("the timeline does not end with a block end")
+
+        if blocks is not None:
+            presented = [(e.block_index, e.block_n, e.trial_index, e.letter, e.is_target)
+                         for e in self.events if e.kind == ONSET]
+            expected = [(b, block['n'], i, trial['letter'], bool(trial['is_target']))
+                        for b, block in enumerate(blocks) for i, trial in enumerate(block['trials'])]
+            if presented != expected:
+                problems.append(f"trials do not match the blocks ({len(presented)} presented, "
+                                f"{len(expected)} in the blocks)")
+        return problems
+
+    def rows(self):
+        for e in self.events:
+            yield [e.kind, e.time_ns / 1_000_000, e.duration_ns / 1_000_000, e.block_index, e.block_n,
+                   e.trial_index, e.letter, e.is_target, e.expected_response, e.text]
+
+    def write_csv(self, path):
+        with atomic_write(path) as f:
+            writer = csv.writer(f)
+            writer.writerow(TIMELINE_FIELDS)
+            writer.writerows([['' if v is None else v for v in row] for row in self.rows()])
+
+
+def compile_timeline(blocks, banner_ms=BLOCK_BANNER_DURATION * 1000,
+                     stimulus_ms=STIMULUS_DURATION * 1000, iti_ms=ITI_DURATION * 1000):
+    """Compile prepared blocks (as from prepare_blocks) into a Timeline"""
+    to_ns = 1_000_000
+    banner_ns = int(banner_ms * to_ns)
+    stimulus_ns = int(stimulus_ms * to_ns)
+    iti_ns = int(iti_ms * to_ns)
+
+    events = []
+    t = 0
+    for b, block in enumerate(blocks):
+        n = block['n']
+        events.append(TimelineEvent(BANNER, t, banner_ns, b, n, 0, None, None, None, f"{n}-back"))
+        t += banner_ns
+        for i, trial in enumerate(block['trials']):
+            target = bool(trial['is_target'])
+            events.append(TimelineEvent(ONSET, t, stimulus_ns, b, n, i, trial['letter'],
+                                        target, target, None))
+            events.append(TimelineEvent(OFFSET, t + stimulus_ns, iti_ns, b, n, i, trial['letter'],
+                                        target, target, None))
+            t += stimulus_ns + iti_ns
+        events.append(TimelineEvent(BLOCK_END, t, 0, b, n, len(block['trials']),
+                                    None, None, None, None))
+    return Timeline(events, banner_ns, stimulus_ns, iti_ns)
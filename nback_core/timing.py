@@ -0,0 +1,230 @@
+# nback_core/timing.py
+import os
+import time
+from collections import deque
+
+
+class SessionClock:
+    """Monotonic session clock with a single wall-clock anchor.
+
+    Every event (stimulus onset, key press, stimulus offset) is read from
+    time.perf_counter_ns(), which never jumps with NTP or manual clock changes.
+    The wall clock is read exactly once, when the clock is created, so that
+    monotonic readings can still be reported as absolute epoch times.
+    """
+
+    def __init__(self):
+        # Bracket the wall-clock read with two monotonic reads and use the
+        # midpoint, so the anchor error is at most half the bracket width.
+        before = time.perf_counter_ns()
+        wall = time.time_ns()
+        after = time.perf_counter_ns()
+        self.anchor_ns = (before + after) // 2
+        self.anchor_wall_ns = wall
+        self.anchor_uncertainty_ns = after - before
+
+    def now(self):
+        """Current monotonic time in ns"""
+        return time.perf_counter_ns()
+
+    def elapsed_ms(self, t_ns):
+        """Milliseconds since the session anchor"""
+        return (t_ns - self.anchor_ns) / 1_000_000
+
+    def to_epoch_ms(self, t_ns):
+        """Convert a monotonic reading to ms since epoch (Jan 1, 1970)"""
+        if t_ns is None:
+            return None
+        return round((self.anchor_wall_ns + (t_ns - self.anchor_ns)) / 1_000_000, 3)
+
+    def to_timestamp(self, t_ns):
+        """Convert a monotonic reading to a local 'YYYY-mm-dd HH:MM:SS' string"""
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.to_epoch_ms(t_ns) / 1000))
+
+
+def interval_ms(start_ns, end_ns):
+    """Interval between two monotonic readings in ms, kept to microsecond resolution"""
+    if start_ns is None or end_ns is None:
+        return None
+    return round((end_ns - start_ns) / 1_000_000, 3)
+
+
+# Tk event timestamps are unsigned 32-bit milliseconds and wrap around
+EVENT_TIME_WRAP_MS = 2 ** 32
+# Calibration samples older than this are dropped, so slow drift between the
+# event clock and the monotonic clock is tracked
+EVENT_CALIBRATION_WINDOW_S = 60
+
+
+class EventTimeMapper:
+    """Map Tk event timestamps (event.time, ms) onto the session's monotonic clock.
+
+    event.time is stamped by the window system when the input happens, on its
+    own clock with an unknown epoch. Every observed event gives an upper bound
+    on the offset between the two clocks: (monotonic time the handler ran) -
+    (event time), which exceeds the true offset by that event's dispatch delay.
+    The smallest value over the recent window is the estimate, so it is as
+    good as the fastest-dispatched event seen. Feed it every input event
+    (observe), not just the responses, to keep it calibrated.
+    """
+
+    def __init__(self, window_s=EVENT_CALIBRATION_WINDOW_S):
+        self.window_ns = int(window_s * 1_000_000_000)
+        self._window = deque()  # (observed_ns, offset_ns), offsets increasing
+        self._last_raw = None
+        self._wraps = 0
+
+    def _unwrap(self, event_ms):
+        raw = event_ms % EVENT_TIME_WRAP_MS
+        if self._last_raw is not None and raw < self._last_raw - EVENT_TIME_WRAP_MS // 2:
+            self._wraps += 1
+        self._last_raw = raw
+        return raw + self._wraps * EVENT_TIME_WRAP_MS
+
+    def observe(self, event_ms, now_ns):
+        """Calibrate from an event with timestamp event_ms handled at now_ns"""
+        if not event_ms:
+            return  # Synthesized events carry no timestamp
+        offset = now_ns - self._unwrap(event_ms) * 1_000_000
+        window = self._window
+        while window and window[-1][1] >= offset:
+            window.pop()
+        window.append((now_ns, offset))
+        while window[0][0] < now_ns - self.window_ns:
+            window.popleft()
+
+    def offset_ns(self):
+        """Current offset estimate (monotonic ns - event ns), or None before any event"""
+        return self._window[0][1] if self._window else None
+
+    def to_ns(self, event_ms, now_ns):
+        """Monotonic time of an event handled at now_ns (now_ns if it has no timestamp)"""
+        self.observe(event_ms, now_ns)
+        offset = self.offset_ns()
+        if not event_ms or offset is None:
+            return now_ns
+        return min(now_ns, self._unwrap(event_ms) * 1_000_000 + offset)
+
+
+# Wake this many ms before a deadline and busy-wait the remainder, since Tk
+# timers only have whole-millisecond resolution and often fire a little late.
+SCHEDULER_SPIN_MS = 2
+
+
+class DeadlineScheduler:
+    """Fire Tk callbacks at absolute deadlines on a SessionClock.
+
+    Chaining relative root.after() delays adds every callback's latency to the
+    next delay, so errors accumulate over a session. Here each event is given
+    an absolute deadline and its delay is recomputed from the clock when it is
+    scheduled, so lateness in one event never shifts the ones after it.
+    Every fired event is logged as (label, scheduled_ns, actual_ns, error_ns).
+    """
+
+    def __init__(self, root, clock, spin_ms=SCHEDULER_SPIN_MS):
+        self.root = root
+        self.clock = clock
+        self.spin_ns = int(spin_ms * 1_000_000)
+        self.log = []
+        self._pending = {}
+        self._deadlines = {}
+        self._next_token = 0
+
+    def at(self, deadline_ns, callback, label=None):
+        """Run callback at deadline_ns (a clock.now() reading)"""
+        token = self._next_token
+        self._next_token += 1
+        delay_ms = max(0, (deadline_ns - self.spin_ns - self.clock.now()) // 1_000_000)
+        self._deadlines[token] = deadline_ns
+        self._pending[token] = self.root.after(
+            delay_ms, lambda: self._fire(token, deadline_ns, callback, label))
+        return token
+
+    def due_within(self, ms):
+        """True if an event is due within ms (or overdue), e.g. to hold off other work"""
+        if not self._deadlines:
+            return False
+        return min(self._deadlines.values()) - self.clock.now() <= ms * 1_000_000 + self.spin_ns
+
+    def idle(self, callback):
+        """Run callback once the current event is done (e.g. deferred I/O)"""
+        self.root.after_idle(callback)
+
+    def _fire(self, token, deadline_ns, callback, label):
+        self._pending.pop(token, None)
+        self._deadlines.pop(token, None)
+        now = self.clock.now
+        while now() < deadline_ns:
+            pass
+        actual_ns = now()
+        self.log.append((label, deadline_ns, actual_ns, actual_ns - deadline_ns))
+        callback()
+
+    def cancel_all(self):
+        """Cancel every event that has not fired yet"""
+        for after_id in self._pending.values():
+            try:
+                self.root.after_cancel(after_id)
+            except Exception:
+                pass
+        self._pending.clear()
+        self._deadlines.clear()
+
+    def max_error_ms(self):
+        """Largest absolute scheduling error seen so far, in ms"""
+        if not self.log:
+            return 0.0
+        return max(abs(entry[3]) for entry in self.log) / 1_000_000
+
+
+class StartupProfiler:
+    """Time each cold-start phase, from the first line of the main script.
+
+    mark(phase) closes the phase that ran since the previous mark. record()
+    adds a phase measured elsewhere (e.g. TTS init on the speech thread).
+    report() appends a one-line summary, checked against a budget, to a log.
+    """
+
+    def __init__(self, start_ns=None, verbose=False):
+        self.start_ns = start_ns if start_ns is not None else time.perf_counter_ns()
+        self.verbose = verbose
+        self.phases = []
+        self._last_ns = self.start_ns
+        self._reported = False
+
+    def mark(self, phase):
+        now = time.perf_counter_ns()
+        self.phases.append((phase, now - self._last_ns))
+        self._last_ns = now
+
+    def record(self, phase, duration_ns):
+        # Measured off the main thread: overlaps the marked phases, not part of the total
+        phase = f"{phase}[bg]"
+        self.phases.append((phase, duration_ns))
+        if self.verbose and self._reported:
+            print(f"[startup] {phase:<20} {duration_ns / 1_000_000:9.1f} ms (after first paint)")
+
+    def total_ms(self):
+        return (self._last_ns - self.start_ns) / 1_000_000
+
+    def report(self, budget_ms, log_path=None):
+        """Summarize the cold start; returns the summary line"""
+        self._reported = True
+        total = self.total_ms()
+        status = "OK" if total <= budget_ms else "OVER BUDGET"
+        phases = " ".join(f"{name}={ns / 1_000_000:.1f}" for name, ns in self.phases)
+        line = (f"{time.strftime('%Y-%m-%d %H:%M:%S')} cold start {total:.1f} ms "
+                f"(budget {budget_ms} ms, {status}) {phases}")
+
+        if self.verbose:
+            for name, ns in self.phases:
+                print(f"[startup] {name:<20} {ns / 1_000_000:9.1f} ms")
+            print(f"[startup] {'total':<20} {total:9.1f} ms  (budget {budget_ms} ms, {status})")
+        if log_path:
+            try:
+                os.makedirs(os.path.dirname(log_path), exist_ok=True)
+                with open(log_path, 'a') as f:
+                    f.write(line + "\n")
+            except OSError:
+                pass
+        return line
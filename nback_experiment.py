@@ -1,27 +1,54 @@
 # nback_experiment.py
-import tkinter as tk
 import time
-import random
+_startup_ns = time.perf_counter_ns()  # Cold-start reference point, taken before any other import
+
+import tkinter as tk
 import csv
 import sys
 import os
-import pyttsx3
 from tkinter import ttk, messagebox
 from pathlib import Path
+from nback_core.config import (STIMULUS_DURATION, TUTORIAL_STIMULUS_DURATION, ITI_DURATION,
+                               BLOCK_BANNER_DURATION, LETTERS, NUM_VERSIONS)
+from nback_core.timing import (SessionClock, DeadlineScheduler, StartupProfiler,
+                               EventTimeMapper, interval_ms)
+from nback_core.session import TrialSession
+from nback_core.timeline import compile_timeline
+from nback_core.speech import SpeechWorker, NarrationCache
+from nback_core.roster import RosterIndex, RosterError
+from nback_core.journal import (TRIAL, BLOCK, RESUME, COMPLETE, start_journal, resume_journal,
+                                find_unfinished, read_journal, atomic_write)
+from nback_core.store import TrialStore, export_journal
+from nback_core.scoring import SessionStats
+from nback_core.manifest import default_params, load_manifest, SequenceManifest
+from nback_core.collector import CollectorClient
+from nback_core.persist import WriteBehind
+from nback_core.instrument import CallbackTimer, write_report
+from nback_glyphs import GlyphRenderer, DOT
+from nback_frames import FrameStack
 
 # --- Config ---
-STIMULUS_DURATION = 0.5  # seconds (500 ms) for main experiment
-TUTORIAL_STIMULUS_DURATION = 2.0  # 2 seconds for tutorial
-ITI_DURATION = 1.5  # seconds in between stimuli
-TRAINING_TRIALS = 15
-EXPERIMENT_TRIALS = 30
-TARGET_PERCENTAGE = 0.2
-N_LEVELS = [1, 2, 3, 4, 5]
-#DIGITS = list(range(10)) - if we want to use numbers instead of letters
-LETTERS = ['B', 'F', 'G', 'H', 'K', 'M', 'Q', 'T', 'R', 'X']  # Phonologically distinct letters
-SEEDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo']
+# Trial timing, N levels, letters and seeds are in nback_core.config (shared with the simulator)
 CSV_PATH = 'sample_sheet.csv'
+TTS_RATE = 150  # words per minute
+TTS_VOICE = None  # pyttsx3 voice id, None for the system default
+APP_DATA_DIR = Path.home() / ".nback"  # Caches and other per-user app files
+NARRATION_CACHE_DIR = APP_DATA_DIR / "narration"
+JOURNAL_DIR = APP_DATA_DIR / "journal"  # Per-session trial journals, written as trials complete
+JOURNAL_FLUSH_EVERY = 5  # Trials buffered between journal writes (always flushed at block end)
+SEQUENCE_MANIFEST = APP_DATA_DIR / "sequences.json"  # Pre-generated blocks for every version
+STARTUP_LOG = APP_DATA_DIR / "startup.log"  # One cold-start summary line per launch
+STARTUP_BUDGET_MS = 2000  # Target time from launch to the painted login screen
+# Print a per-phase startup breakdown (also enabled by NBACK_PROFILE_STARTUP=1)
+PROFILE_STARTUP = '--profile-startup' in sys.argv or os.environ.get('NBACK_PROFILE_STARTUP') == '1'
+# Time Tk callbacks into histograms, reported next to the session CSV (also NBACK_INSTRUMENT=1)
+INSTRUMENT_CALLBACKS = '--instrument' in sys.argv or os.environ.get('NBACK_INSTRUMENT') == '1'
+# Capture a cProfile of the main experiment into the same report (also NBACK_PROFILE_SESSION=1)
+PROFILE_SESSION = '--profile-session' in sys.argv or os.environ.get('NBACK_PROFILE_SESSION') == '1'
 DEBUG = False  # Set to True for debugging output
+PREBUILD_FRAMES = True  # Build the remaining screens in the background once the login screen is up
+EXPERIMENTER_OVERLAY = False  # Show live block performance in a corner during the experiment (F9 toggles)
+COLLECTOR_ADDRESS = None  # ("host", port) of a lab result collector (see nback_core.collector), or None
 
 # --- Turorial Instructions ---
 NARRATIONS = {
@@ -72,83 +99,134 @@ else:
 if DEBUG:
     print(f"Using CSV path: {CSV_PATH}")
 
+# Participant roster, parsed once and re-parsed only when the file changes
+roster = RosterIndex(CSV_PATH)
+
+# --- Command line tools (run instead of the experiment) ---
+if '--build-manifest' in sys.argv or '--verify-manifest' in sys.argv:
+    params = default_params()
+    if '--build-manifest' in sys.argv:
+        manifest = SequenceManifest.build(params, NUM_VERSIONS)
+        manifest.save(SEQUENCE_MANIFEST)
+        print(f"Wrote {len(manifest)} versions to {SEQUENCE_MANIFEST} (checksum {manifest.checksum})")
+    else:
+        try:
+            manifest = SequenceManifest.read(SEQUENCE_MANIFEST)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Cannot verify {SEQUENCE_MANIFEST}: {e}")
+            sys.exit(1)
+        if manifest.params != params:
+            print(f"{SEQUENCE_MANIFEST} was generated with a different config; run --build-manifest")
+            sys.exit(1)
+        mismatched = manifest.verify()
+        if mismatched:
+            print(f"Versions {mismatched} do not match regeneration")
+            sys.exit(1)
+        print(f"OK: all {len(manifest)} versions match regeneration (checksum {manifest.checksum})")
+    sys.exit(0)
+
+if '--check-schedules' in sys.argv or '--export-schedule' in sys.argv:
+    manifest, _ = load_manifest(SEQUENCE_MANIFEST, default_params(), NUM_VERSIONS)
+    if '--export-schedule' in sys.argv:
+        # --export-schedule VERSION [FILE]: the timeline of one version as CSV
+        args = sys.argv[sys.argv.index('--export-schedule') + 1:]
+        version = args[0] if args else '1'
+        if not version.isdigit() or not 1 <= int(version) <= NUM_VERSIONS:
+            print(f"Usage: {os.path.basename(sys.argv[0])} --export-schedule [VERSION [FILE]]\n"
+                  f"VERSION is a visit number from 1 to {NUM_VERSIONS} (default 1)", file=sys.stderr)
+            sys.exit(2)
+        version = int(version)
+        # Not named like a session CSV, so analytics never picks it up
+        out = args[1] if len(args) > 1 else f"nback_v{version}_schedule.csv"
+        compile_timeline(manifest.blocks(version)).write_csv(out)
+        print(f"Wrote the schedule of version {version} to {out}")
+        sys.exit(0)
+    failed = 0
+    for version in range(1, NUM_VERSIONS + 1):
+        blocks = manifest.blocks(version)
+        problems = compile_timeline(blocks).check(blocks)
+        for problem in problems:
+            print(f"Version {version}: {problem}")
+        failed += bool(problems)
+    print(f"{NUM_VERSIONS - failed} of {NUM_VERSIONS} session schedules passed their check")
+    sys.exit(1 if failed else 0)
+
+startup = StartupProfiler(_startup_ns, verbose=PROFILE_STARTUP or DEBUG)
+startup.mark("imports")
+
+# Per-callback wall time; when disabled the decorators below return the functions unchanged
+callbacks = CallbackTimer(enabled=INSTRUMENT_CALLBACKS, profile=PROFILE_SESSION)
+
 # --- State ---
 participant_id = None
 current_version = None
 first_time_participant = False
-experiment_data = []
+experiment_data = None  # TrialStore of the current session's trials
 trial_index = 0
 block_index = 0
 experiment_blocks = []
-rng = None
+session_timeline = None  # experiment_blocks compiled into a schedule of events (see nback_core.timeline)
+sequence_manifest = None  # Loaded on first use (see get_manifest)
+manifest_future = None  # Background load of the manifest, started after the first paint
 current_instruction_page = 0
+session_clock = None  # Monotonic clock anchored once per session (see nback_core.timing)
+scheduler = None  # Absolute-deadline scheduler for the main experiment
+session = None  # TrialSession running the main experiment (see nback_core.session)
+event_clock = EventTimeMapper()  # Maps Tk event timestamps onto the monotonic clock
+collector = None  # CollectorClient uploading trials, when COLLECTOR_ADDRESS is set
+session_started = None  # Start stamp of the current session (from its journal), identifies it to the collector
+io_bridge = None  # asyncio loop for background I/O, started after the first paint (see nback_core.aio)
+persistence = None  # WriteBehind writing session files, started with io_bridge (see nback_core.persist)
+journal = None  # Append-only record of the current session (see nback_core.journal)
+session_segment = 0  # Number of times this session has been resumed after an interruption
 
 # --- Init voice engine ---
-try:
-    engine = pyttsx3.init()
-    engine.setProperty('rate', 150) 
-except Exception as e:
-    engine = None
-    print(f"TTS initialization failed: {e}")
-
+# Narration runs on its own thread; these calls only queue a command and return.
+# NARRATIONS are rendered to disk once and replayed from the cache afterwards.
+narrator = SpeechWorker(rate=TTS_RATE, voice=TTS_VOICE,
+                        cache=NarrationCache(NARRATION_CACHE_DIR, TTS_RATE, TTS_VOICE),
+                        prerender=NARRATIONS.values(), on_timing=startup.record, debug=DEBUG)
+narrator.start()
+startup.mark("tts_worker_start")
+
+@callbacks.timed()
 def speak(text):
-    """Speak text using TTS if available"""
-    if not engine:
-        return
-    try:
-        engine.say(text)
-        engine.runAndWait()
-    except Exception as e:
-        if DEBUG:
-            print(f"TTS Error: {str(e)}")
+    """Speak text using TTS if available, cutting off any narration in progress"""
+    narrator.replace(text)
+
+def stop_speech():
+    """Stop any ongoing narration"""
+    narrator.stop()
 
 # --- Function Definitions ---
-def seeded_rng(seed_word):
-    """Create a seeded random number generator"""
-    seed = sum(ord(c) for c in seed_word)
-    return random.Random(seed)
+def get_manifest():
+    """Sequence manifest for the current config, built and cached on first use"""
+    global sequence_manifest
+    if sequence_manifest is None:
+        try:
+            # Still loading in the background: wait for it rather than building it twice
+            sequence_manifest, rebuilt = manifest_future.result()
+        except Exception:
+            sequence_manifest, rebuilt = load_manifest(SEQUENCE_MANIFEST, default_params(), NUM_VERSIONS)
+        if DEBUG:
+            print(f"{'Built' if rebuilt else 'Loaded'} sequence manifest for {len(sequence_manifest)} versions")
+    return sequence_manifest
+
+def preload_manifest():
+    """Load (or build) the sequence manifest in the background before it is needed"""
+    global manifest_future
+    manifest_future = io_bridge.run_blocking(load_manifest, SEQUENCE_MANIFEST, default_params(),
+                                             NUM_VERSIONS)
 
 def prepare_blocks(training=False):
     """Prepare blocks for the experiment"""
-    global experiment_blocks, block_index, rng
+    global experiment_blocks, block_index, session_timeline
     
-    experiment_blocks = []
-    seed_word = SEEDS[current_version - 1]
-    rng = seeded_rng(seed_word)
-    levels = N_LEVELS
-        
-    for n in levels:
-        trials = []
-        target_indices = []
-        
-        # Only create targets if we have enough trials
-        if EXPERIMENT_TRIALS > n:
-            num_targets = max(1, int(EXPERIMENT_TRIALS * TARGET_PERCENTAGE))
-            target_indices = rng.sample(range(n, EXPERIMENT_TRIALS), num_targets)
-        
-        for i in range(EXPERIMENT_TRIALS):
-            is_target = False
-            letter = None
-            
-            if i < n:
-                # First n trials can't be targets
-                letter = rng.choice(LETTERS)
-            elif i in target_indices:
-                # Target trial
-                letter = trials[i - n]['letter']
-                is_target = True
-            else:
-                # Non-target trial
-                prev_letter = trials[i - n]['letter']
-                # Efficient letter selection without creating a new list
-                letter = rng.choice([d for d in LETTERS if d != prev_letter])
-                
-            trials.append({"letter": letter, "is_target": is_target})
-        
-        experiment_blocks.append({
-            "n": n, 
-            "trials": trials, 
-        })
+    # Generated ahead of time from the version's seed; see nback_core.manifest
+    experiment_blocks = get_manifest().blocks(current_version)
+    # Every banner, onset, offset and block end, with its time, before anything runs
+    session_timeline = compile_timeline(experiment_blocks, BLOCK_BANNER_DURATION * 1000,
+                                        STIMULUS_DURATION * 1000, ITI_DURATION * 1000)
     
     block_index = 0
     if DEBUG:
@@ -192,130 +270,149 @@ def get_tutorial_blocks():
         ])
     ]
 
-def start_block():
-    """Start the current block"""
-    global trial_index
-    trial_index = 0
-    stimulus_label.config(text="Starting 1-back...", fg="white")
-    instruction_label.config(text="")
-    feedback_label.config(text="")
-    root.update_idletasks()  
-    root.after(1500, run_trial)
-
-def run_trial():
-    """Run a single trial - no instructions or feedback for actual trials"""
-    global trial_index, block_index
-    
-    stimulus_label.config(font=("Helvetica", 144, "bold"))
-    
-    if DEBUG:
-        print(f"Block: {block_index}/{len(experiment_blocks)}, Trial: {trial_index}")
-    
-    # Check if all blocks are finished
-    if block_index >= len(experiment_blocks):
-        end_experiment()
+def journal_path():
+    """Journal file for the current participant and version"""
+    return JOURNAL_DIR / f"nback_{participant_id}_v{current_version}.jsonl"
+
+class TkDisplay:
+    """Shows a TrialSession's events on the experiment frame"""
+
+    def show_banner(self, text):
+        stimulus.show_text(text)
+        instruction_label.config(text="")  # No instructions for actual trials
+        feedback_label.config(text="")  # No feedback for actual trials
+        root.update_idletasks()
+
+    def show_stimulus(self, letter):
+        stimulus.show(letter)
+        root.update_idletasks()
+
+    def show_fixation(self):
+        # Inter-trial interval indicator
+        stimulus.show(DOT)
+        root.update_idletasks()
+
+def start_block(resumed=False):
+    """Start the experiment, or continue a resumed session at block_index/trial_index"""
+    global trial_index, scheduler, journal, session_segment, experiment_data, session, collector, session_started
+    problems = session_timeline.check(experiment_blocks)
+    if problems:
+        messagebox.showerror("Schedule Error", "The session schedule failed its check:\n" +
+                             "\n".join(problems[:10]))
         return
-    
-    block = experiment_blocks[block_index]
-    trials = block['trials']
-    
-    # Check if current block is finished
-    if trial_index >= len(trials):
-        block_index += 1
+    if not resumed:
         trial_index = 0
-        
-        if block_index < len(experiment_blocks):
-            stimulus_label.config(text=f"{experiment_blocks[block_index]['n']}-back", fg="white")
-            root.update_idletasks()  
-            root.after(1500, run_trial)
-        else:
-            end_experiment()
-        return
+        session_segment = 0
+        experiment_data = TrialStore(participant_id, current_version, LETTERS)
+        session_started = session_clock.to_timestamp(session_clock.now())
+        journal = start_journal(journal_path(), JOURNAL_FLUSH_EVERY,
+                                participant_id=participant_id, version=current_version,
+                                anchor_wall_ns=session_clock.anchor_wall_ns,
+                                started=session_started)
+        # The checked schedule, next to the journal, for comparison with the timing log
+        schedule_path = journal_path().with_suffix('.schedule.csv')
+        persistence.submit(lambda: session_timeline.write_csv(schedule_path))
     
-    # Show stimulus
-    trial = trials[trial_index]
-    stimulus_label.config(text=str(trial['letter']), fg='white')  # Always white for actual trials
-    instruction_label.config(text="")  # No instructions for actual trials
-    feedback_label.config(text="")  # No feedback for actual trials
-    root.update_idletasks()  
-    stimulus_onset = time.time() * 1000  # Record exact time stimulus appears (in ms since epoch time, aka Jan 1, 1970)
+    stimulus.warm_up()  # Render every letter once before the first timed trial
     
-    response = {'pressed': False, 'rt': None}
-    rt_start = time.time() # Record when we begin measuring for reaction time (in s since epoch time, aka Jan 1, 1970)
-    #note: response recording begins right after the stimulus is shown
-    response_time_val = None
+    if COLLECTOR_ADDRESS and collector is None:
+        collector = CollectorClient(COLLECTOR_ADDRESS, debug=DEBUG)
+        collector.start()
+    if collector and resumed:
+        # Trials from before the interruption may not have reached the collector; it drops repeats
+        for i in range(len(experiment_data)):
+            collector.submit(dict(experiment_data.record(i), type=TRIAL, session=session_started))
+        stats = SessionStats.from_store(experiment_data)
+        for b in range(block_index):
+            if stats.block(b) is not None:
+                collector.submit(dict(stats.block(b).summary(), type=BLOCK, session=session_started,
+                                      participant_id=participant_id, version=current_version))
     
-    def on_key_press(event):
-        """Handle key press during stimulus presentation"""
-        nonlocal response, response_time_val
-        if event.keysym == 'space' and not response['pressed']:
-            response['pressed'] = True
-            
-            # Record participant's reaction time in ms (subtract time of key press from when we began measuring)
-            response['rt'] = int((time.time() - rt_start) * 1000)
-
-            # Record exact time participant pressed the key (in ms since epoch time, aka Jan 1, 1970)
-            response_time_val = time.time() * 1000  
-            if DEBUG:
-                print(f"Key pressed at {response['rt']}ms")
-
-    # Bind key handler
+    # Every onset and offset of the session is fixed relative to the start
+    if scheduler:
+        scheduler.cancel_all()
+    scheduler = DeadlineScheduler(root, session_clock)
+    session = TrialSession(experiment_blocks, session_clock, scheduler, TkDisplay(),
+                           experiment_data, journal,
+                           banner_ms=BLOCK_BANNER_DURATION * 1000,
+                           stimulus_ms=STIMULUS_DURATION * 1000,
+                           iti_ms=ITI_DURATION * 1000,
+                           segment=session_segment, timeline=session_timeline,
+                           on_finish=end_experiment,
+                           on_trial=trial_recorded, on_block_end=block_finished, debug=DEBUG)
+    callbacks.instrument(session, '_onset', 'session.onset')
+    callbacks.instrument(session, '_offset', 'session.offset')
+    callbacks.instrument(session, '_block_end', 'session.block_end')
+    callbacks.instrument(journal, 'maybe_flush', 'journal.flush')
+    callbacks.start_profile()
     root.unbind('<Key>')
     root.bind('<Key>', on_key_press)
-    
-    def end_trial():
-        """End the current trial - no feedback for actual trials"""
-        nonlocal response, stimulus_onset, response_time_val
-        global trial_index
-        
-        root.unbind('<Key>')
-        
-        # Calculate accuracy for logging
-        accuracy = None
-        if trial['is_target']:
-            accuracy = response['pressed']
-        else:
-            accuracy = not response['pressed']
-
-        # Log trial data
-        trial_data = {
-            "participant_id": participant_id,
-            "version": current_version,
-            "block_n": block['n'],
-            "trial_index": trial_index,
-            "stimulus_letter": trial['letter'],
-            "is_target": trial['is_target'],
-            "response": response['pressed'],
-            "accuracy": accuracy,
-            "rt": response['rt'],
-            "stimulus_onset": stimulus_onset,
-            "response_time": response_time_val,
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-        experiment_data.append(trial_data)
-
-        # Show inter-trial interval indicator
-        stimulus_label.config(font=("Helvetica", 48, "bold"), text="•", fg="white")
-        root.update_idletasks()  
-        
-        trial_index += 1
-        root.after(int(ITI_DURATION * 1000), run_trial)
+    session.start(block_index, trial_index, resumed)
+
+@callbacks.timed()
+def on_key_press(event):
+    """Space during a stimulus is the participant's response"""
+    callback_ns = session_clock.now()  # Read first, so handler work never inflates the RT
+    # The RT runs to when the key went down, not to when Tk got round to this handler
+    press_ns = event_clock.to_ns(event.time, callback_ns)
+    if event.keysym == 'space' and session.press(press_ns, callback_ns) and DEBUG:
+        print(f"Key pressed at {interval_ms(session.onset_ns, press_ns)}ms "
+              f"(handler {interval_ms(press_ns, callback_ns)}ms later)")
+
+@callbacks.timed()
+def trial_recorded(block_stats):
+    """After each trial (in idle time): upload it and refresh the overlay"""
+    if collector:
+        collector.submit(dict(experiment_data.record(-1), type=TRIAL, session=session_started))
+    update_overlay(block_stats)
+
+def update_overlay(block_stats):
+    """Show the running stats of the current block on the experimenter overlay"""
+    if not overlay_visible:
+        return
+    summary = block_stats.summary()
+    rt = f"{summary['rt_mean']:.0f}" if summary['rt_mean'] is not None else "-"
+    overlay_label.config(text=f"{summary['block_n']}-back  trial {summary['trials']}  "
+                              f"H {summary['hits']}  M {summary['misses']}  "
+                              f"FA {summary['false_alarms']}  CR {summary['correct_rejections']}  "
+                              f"d' {summary['d_prime']:.2f}  RT {rt} ms")
+
+def toggle_overlay(event=None):
+    """Show or hide the experimenter overlay"""
+    global overlay_visible
+    overlay_visible = not overlay_visible
+    if overlay_visible:
+        overlay_label.place(relx=1.0, rely=0.0, anchor='ne', x=-10, y=10)
+        if session is not None and session.stats.block(session.block_index) is not None:
+            update_overlay(session.stats.block(session.block_index))
+    else:
+        overlay_label.place_forget()
+
+@callbacks.timed()
+def block_finished(summary):
+    """After each block (in idle time): upload its summary"""
+    if collector:
+        collector.submit(dict(summary, type=BLOCK, session=session_started, participant_id=participant_id,
+                              version=current_version))
+    if DEBUG:
+        print(f"Block {summary['block_index']} ({summary['block_n']}-back): "
+              f"d' {summary['d_prime']:.2f}, hit rate {summary['hit_rate']}, "
+              f"false-alarm rate {summary['false_alarm_rate']}")
 
-    # Schedule end of trial
-    root.after(int(STIMULUS_DURATION * 1000), end_trial)
+def calibrate_event_clock(event):
+    """Every input event refines the event-time to monotonic-clock offset"""
+    event_clock.observe(event.time, time.perf_counter_ns())
 
+@callbacks.timed()
 def run_tutorial_trial():
     """Run a tutorial trial with immediate feedback and instructions"""
     global trial_index, block_index
 
-    # Reset font to 144 at start of each trial
-    stimulus_label.config(font=("Helvetica", 144, "bold"))
-    
     tutorial_blocks = get_tutorial_blocks()
     
     # Check if all tutorial blocks are finished
     if block_index >= len(tutorial_blocks):
-        show_frame(frame_transition)
+        show_frame('transition')
         return
     
     block = tutorial_blocks[block_index]
@@ -327,36 +424,34 @@ def run_tutorial_trial():
         trial_index = 0
         
         if block_index < len(tutorial_blocks):
-            stimulus_label.config(text=f"{tutorial_blocks[block_index]['n']}-back", fg="white")
+            stimulus.show_text(f"{tutorial_blocks[block_index]['n']}-back")
             instruction_label.config(text="")
             feedback_label.config(text="")
             root.update_idletasks()  
             root.after(1500, run_tutorial_trial)
         else:
-            show_frame(frame_transition)
+            show_frame('transition')
         return
     
     # Show stimulus
     trial = trials[trial_index]
-    stimulus_label.config(text=str(trial['letter']), fg='white')
+    stimulus.show(trial['letter'])
     instruction_label.config(text=f"Press SPACE if this letter matches the one {block['n']} position{'s' if block['n'] > 1 else ''} back")
     feedback_label.config(text="")
     root.update_idletasks()  
-    stimulus_onset = time.time() * 1000  # Record stimulus onset in ms (starting from epoch time, aka Jan 1, 1970)
-    #note: time.time() measures in seconds since epoch time
+    onset_ns = session_clock.now()  # Record stimulus onset on the session's monotonic clock
     
     response = {'pressed': False, 'rt': None}
-    rt_start = time.time() * 1000 # Record reaction time onset in ms (starting from epoch time, aka Jan 1, 1970)
-    response_time_val = None
     feedback_shown = False
     
+    @callbacks.timed('tutorial.on_key_press')
     def on_key_press(event):
         """Handle key press during stimulus presentation"""
-        nonlocal response, response_time_val, feedback_shown
+        nonlocal feedback_shown
+        t_ns = session_clock.now()
         if event.keysym == 'space' and not response['pressed']:
             response['pressed'] = True
-            response['rt'] = int((time.time() - rt_start) * 1000)
-            response_time_val = time.time() * 1000  # Record response time in ms
+            response['rt'] = interval_ms(onset_ns, t_ns)
             
             # Only show feedback if allowed for this trial
             if trial['feedback']:
@@ -378,7 +473,7 @@ def run_tutorial_trial():
                         feedback = "False alarm! You shouldn't press for non-targets."
                 
                 # Show immediate feedback
-                stimulus_label.config(fg=color)
+                stimulus.set_color(color)
                 feedback_label.config(text=feedback)
                 feedback_shown = True
                 root.update_idletasks()
@@ -390,9 +485,10 @@ def run_tutorial_trial():
     root.unbind('<Key>')
     root.bind('<Key>', on_key_press)
     
+    @callbacks.timed('tutorial.end_trial')
     def end_trial():
         """End the current trial with feedback if needed"""
-        nonlocal response, stimulus_onset, response_time_val, feedback_shown
+        nonlocal feedback_shown
         global trial_index
         
         root.unbind('<Key>')
@@ -417,7 +513,7 @@ def run_tutorial_trial():
                     feedback = "False alarm! You shouldn't press for non-targets."
             
             # Show feedback
-            stimulus_label.config(fg=color)
+            stimulus.set_color(color)
             feedback_label.config(text=feedback)
             feedback_shown = True
             root.update_idletasks()
@@ -425,11 +521,12 @@ def run_tutorial_trial():
         # Show feedback for 1.5 seconds, then show ITI dot
         root.after(1500, show_iti)
     
+    @callbacks.timed('tutorial.show_iti')
     def show_iti():
         """Show inter-trial interval after feedback duration"""
         global trial_index  # Add this line to access the global variable
         # Show inter-trial interval indicator
-        stimulus_label.config(font=("Helvetica", 48, "bold"), text="•", fg="white")
+        stimulus.show(DOT)
         root.update_idletasks()  
         
         # Move to next trial after ITI delay 
@@ -444,8 +541,8 @@ def redo_tutorial():
     global trial_index, block_index
     trial_index = 0
     block_index = 0
-    show_frame(frame_experiment)
-    stimulus_label.config(text="Restarting tutorial...", fg="white")
+    show_frame('experiment')
+    stimulus.show_text("Restarting tutorial...")
     instruction_label.config(text="")
     feedback_label.config(text="")
     root.update_idletasks()
@@ -454,94 +551,127 @@ def redo_tutorial():
 def end_experiment():
     """End the experiment"""
     if experiment_blocks and experiment_blocks[0].get('training', False):
-        show_frame(frame_transition)
+        show_frame('transition')
     else:
-        filepath = save_data()
-        show_frame(frame_end)
+        journal.append(COMPLETE)
+        journal.close()
+        callbacks.stop_profile()
+        set_save_status("Saving your data...")
+        save_data()
+        show_frame('end')
 
 def save_data():
-    """Save experiment data to CSV"""
-    
-    if not experiment_data:
-        messagebox.showerror("Error", "No data to save")
-        return
+    """Queue the session's CSVs, built from the session journal, for writing in the background"""
+    # Everything the writer needs is captured now; the worker never reads UI state
+    journal_file = journal.path if journal else None
+    pid, version = participant_id, current_version
+    timing_log = list(scheduler.log) if scheduler else []
+    report, profile_stats = callbacks.snapshot() if INSTRUMENT_CALLBACKS or PROFILE_SESSION else (None, None)
+    blocks, clock = experiment_blocks, session_clock
 
     # Determine output directory - use Documents folder
     documents_dir = Path.home() / "Documents"
-    filename = f"nback_{participant_id}_v{current_version}.csv"
+    filename = f"nback_{pid}_v{version}.csv"
     filepath = documents_dir / filename
-    
-    try:
-        with open(filepath, 'w', newline='') as f:
-            fieldnames = [
-            "Participant ID", "Version", "Block N", "Trial Index", 
-            "Stimulus Letter", "Is Target", "Response", "Accuracy",
-            "Reaction Time (ms)", "Stimulus Onset (ms)", "Response Time (ms)",
-            "Timestamp"
-            ]
-
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            # Map old keys to new headers
-            for trial in experiment_data:
-                writer.writerow({
-                    "Participant ID": trial['participant_id'],
-                    "Version": trial['version'],
-                    "Block N": trial['block_n'],
-                    "Trial Index": trial['trial_index'],
-                    "Stimulus Letter": trial['stimulus_letter'],
-                    "Is Target": trial['is_target'],
-                    "Response": trial['response'],
-                    "Accuracy": trial['accuracy'],
-                    "Reaction Time (ms)": trial['rt'],
-                    "Stimulus Onset (ms)": trial['stimulus_onset'],
-                    "Response Time (ms)": trial['response_time'],
-                    "Timestamp": trial['timestamp']
-                })
 
-        if DEBUG:
-            print(f"Data saved to {filepath}")
-    except Exception as e:
-         messagebox.showerror("Save Error", f"Could not save data: {str(e)}\nTried path: {filepath}")
-         return None
-    return str(filepath)
-
-def show_frame(frame):
-    """Show the specified frame"""
+    def write():
+        entries = read_journal(journal_file) if journal_file else []
+        export_journal(entries, documents_dir, pid, version, LETTERS)
+        if timing_log:
+            save_timing_log(documents_dir / f"nback_{pid}_v{version}_timing.csv",
+                            timing_log, blocks, clock)
+        if report:
+            write_report(documents_dir / f"nback_{pid}_v{version}_callbacks.json", report, profile_stats)
+        return str(filepath)
+
+    def saved(path, error):
+        if error is not None:
+            set_save_status(f"Could not save data: {error}\nTried path: {filepath}\n"
+                            f"Every trial is kept in {journal_file}", error=True)
+        else:
+            set_save_status("Your data has been automatically saved!")
+            if DEBUG:
+                print(f"Data saved to {path}")
+
+    persistence.submit(write, on_done=saved, force=True)  # Past max_pending rather than lose the session
+
+def save_timing_log(filepath, log, blocks, clock):
+    """Save the scheduled vs. actual time of every experiment event to CSV"""
+    with atomic_write(filepath) as f:
+        writer = csv.writer(f)
+        writer.writerow(["Event", "Block N", "Trial Index",
+                         "Scheduled (ms)", "Actual (ms)", "Error (ms)"])
+        for (event, block_i, trial_i), scheduled_ns, actual_ns, error_ns in log:
+            block_n = blocks[block_i]['n'] if block_i < len(blocks) else None
+            writer.writerow([event, block_n, trial_i,
+                             round(clock.elapsed_ms(scheduled_ns), 3),
+                             round(clock.elapsed_ms(actual_ns), 3),
+                             round(error_ns / 1_000_000, 3)])
+    if DEBUG:
+        print(f"Timing log saved to {filepath} (max error "
+              f"{max(abs(entry[3]) for entry in log) / 1_000_000:.3f}ms)")
+
+def set_save_status(text, error=False):
+    """Show how saving is going on the end screen"""
+    global save_status
+    save_status = (text, error)
+    if end_status_label is not None:
+        end_status_label.config(text=text, foreground="#ff6b6b" if error else "")
+
+@callbacks.timed()
+def show_frame(name):
+    """Show the named frame, building it first if needed"""
     # Unbind keys when switching frames
     root.unbind('<Key>')
     
-    # Hide all frames
-    for f in [frame_csv_login, frame_pid_login, frame_experiment, 
-             frame_transition, frame_end, frame_instruction_1, 
-             frame_instruction_2, frame_instruction_3, frame_instruction_4]:
-        f.pack_forget()
+    # Only the current frame is hidden and the new one shown; Tk redraws at idle
+    screens.show(name)
     
-    # Show requested frame
-    frame.pack(expand=True, fill='both')
-    root.update_idletasks()
-    
-    # Set focus appropriately
+    # Set focus appropriately, once the frame is mapped
     def set_focus():
         try:
-            if frame == frame_csv_login:
-                entry_first.focus_set()
-                entry_first.select_range(0, tk.END)
-            elif frame == frame_pid_login:
-                entry_pid.focus_set()
-                entry_pid.select_range(0, tk.END)
-            elif frame == frame_experiment:
+            target = focus_targets.get(name)
+            if name == 'experiment':
                 root.focus_set()
-            elif frame == frame_transition:
-                btn_start_experiment.focus_set()
-            elif frame in [frame_instruction_1, frame_instruction_2, frame_instruction_3, frame_instruction_4]:
-                btn_next.focus_set()
+            elif target is not None:
+                target.focus_set()
+                if isinstance(target, ttk.Entry):
+                    target.select_range(0, tk.END)
         except Exception:
             pass
     
-    root.after(50, set_focus)
+    root.after_idle(set_focus)
+
+def refresh_roster():
+    """Reload the roster if sample_sheet.csv changed since the last login attempt"""
+    if roster.refresh():
+        roster_loaded()
 
+def roster_loaded():
+    if DEBUG:
+        print(f"Loaded {len(roster)} participants from {CSV_PATH}")
+    if roster.duplicates:
+        print(f"Warning: duplicate names in {CSV_PATH}: {', '.join(sorted(roster.duplicates))}")
+
+def preload_roster():
+    """Index the roster in the background ahead of the first login attempt"""
+    def loaded(reloaded, error):
+        if reloaded:
+            roster_loaded()  # RosterErrors are reported on login
+    io_bridge.run_blocking(roster.refresh, on_done=loaded)
+
+def start_io_bridge():
+    """Start the background I/O loop; its results never run close to a scheduled trial event"""
+    global io_bridge, persistence
+    from nback_core.aio import AsyncBridge, HANDOFF_GUARD_MS  # asyncio is slow to import; not before first paint
+    io_bridge = AsyncBridge(root, busy=lambda: scheduler is not None and scheduler.due_within(HANDOFF_GUARD_MS),
+                            debug=DEBUG).start()
+    # Session files are written on a worker thread, retried if the disk hiccups; its
+    # completions come back through io_bridge's guarded poll
+    persistence = WriteBehind(io_bridge, debug=DEBUG)
+    persistence.start()
+
+@callbacks.timed()
 def handle_csv_login():
     """Handle CSV-based login"""
     global participant_id, current_version, first_time_participant
@@ -558,27 +688,24 @@ def handle_csv_login():
         return
     
     try:
-        if not os.path.exists(CSV_PATH):
-            lbl_csv_error.config(text="Error: sample_sheet.csv not found")
-            return
-        
-        with open(CSV_PATH) as f:
-            reader = csv.DictReader(f)
-            participants = list(reader)
-            
-        if not participants or 'Participant' not in participants[0]:
-            lbl_csv_error.config(text="Error: Invalid CSV format")
-            return
-            
+        refresh_roster()
+    except RosterError as e:
+        lbl_csv_error.config(text=f"Error: {str(e)}")
+        return
+    
+    try:
         full_name = f"{first} {last}"
-        participant = next((p for p in participants if p['Participant'].strip().lower() == full_name), None)
+        if roster.is_duplicate(full_name):
+            lbl_csv_error.config(text="More than one participant has this name - please login with pID")
+            return
+        participant = roster.find_name(full_name)
         
         if participant:
-            participant_id = participant['Participant iD'].strip()
-            current_version = int(participant['Trial Number'].strip())
+            participant_id = participant.pid
+            current_version = int(participant.trial_number)
             first_time_participant = (current_version == 1)
             
-            if current_version > 5:
+            if current_version > NUM_VERSIONS:
                 messagebox.showinfo("Complete", "You've finished all trials!")
                 root.quit()
                 return
@@ -592,6 +719,7 @@ def handle_csv_login():
         if DEBUG:
             print(f"CSV Error: {str(e)}")
 
+@callbacks.timed()
 def handle_pid_login():
     """Handle PID-based login"""
     global participant_id, current_version, first_time_participant
@@ -602,10 +730,19 @@ def handle_pid_login():
         messagebox.showerror("Error", "Please fill all fields")
         return
     
+    # Only check IDs against the roster when there is one with IDs to check against
+    try:
+        refresh_roster()
+        if roster.has_pids and roster.find_pid(pid) is None:
+            messagebox.showerror("Error", f"Participant ID {pid} not found in sample_sheet.csv")
+            return
+    except RosterError:
+        pass
+    
     try:
         current_version = int(version)
-        if current_version < 1 or current_version > 5:
-            raise ValueError("Version must be between 1-5")
+        if current_version < 1 or current_version > NUM_VERSIONS:
+            raise ValueError(f"Version must be between 1-{NUM_VERSIONS}")
         participant_id = pid
         first_time_participant = (current_version == 1)  # Assume not first time for manual login
         show_instructions()
@@ -651,6 +788,8 @@ def on_tab_key(event):
 
 def update_instruction_buttons():
     """Update instruction buttons based on participant status"""
+    if btn_skip is None:  # Training page not built yet; its factory calls this
+        return
     if first_time_participant:
         btn_skip.config(state="disabled")
         instruction_note.config(text="Training is mandatory for first-time participants", foreground="#ff9900")
@@ -660,26 +799,26 @@ def update_instruction_buttons():
 
 def update_instruction_titles():
     """Update instruction titles with participant ID"""
-    welcome_title.config(text=f"Welcome to the N-back experiment, Participant {participant_id}")
-    training_title.config(text=f"Training Instructions - Participant {participant_id}")
+    # Pages not built yet pick the title up from their factory
+    if welcome_title is not None:
+        welcome_title.config(text=f"Welcome to the N-back experiment, Participant {participant_id}")
+    if training_title is not None:
+        training_title.config(text=f"Training Instructions - Participant {participant_id}")
 
 def replay_speech():
     """Stop any ongoing speech and replay the current instruction."""
-    if not engine:
-        return
-    try:
-        engine.stop()                       
-        speak(NARRATIONS[current_instruction_page])
-    except Exception as e:
-        if DEBUG:
-            print(f"Replay error: {e}")
+    speak(NARRATIONS[current_instruction_page])
 
 def show_instructions():
     """Show instruction screens"""
-    global current_instruction_page
+    global current_instruction_page, session_clock
+    # A session starts at login: anchor one monotonic clock to the wall clock here
+    session_clock = SessionClock()
+    if offer_resume():
+        return
     current_instruction_page = 1
     update_instruction_titles()
-    show_frame(frame_instruction_1)
+    show_frame('instruction_1')
     update_instruction_buttons()
     speak(NARRATIONS[1])
 
@@ -687,39 +826,27 @@ def next_instruction():
     """Show next instruction page"""
     global current_instruction_page
     current_instruction_page += 1
-    if current_instruction_page == 1:
-        show_frame(frame_instruction_1)
-        speak(NARRATIONS[1])
-    elif current_instruction_page == 2:
-        show_frame(frame_instruction_2)
-        speak(NARRATIONS[2])
-    elif current_instruction_page == 3:
-        show_frame(frame_instruction_3)
-        speak(NARRATIONS[3])
-    elif current_instruction_page == 4:
-        show_frame(frame_instruction_4)
-        speak(NARRATIONS[4])
+    if 1 <= current_instruction_page <= 4:
+        show_frame(f'instruction_{current_instruction_page}')
+        speak(NARRATIONS[current_instruction_page])
 
 def prev_instruction():
     """Show previous instruction page"""
     global current_instruction_page
     current_instruction_page -= 1
-    if current_instruction_page == 1:
-        show_frame(frame_instruction_1)
-    elif current_instruction_page == 2:
-        show_frame(frame_instruction_2)
-    elif current_instruction_page == 3:
-        show_frame(frame_instruction_3)
-    elif current_instruction_page == 4:
-        show_frame(frame_instruction_4)
+    stop_speech()  # Narration belongs to the page we just left
+    if 1 <= current_instruction_page <= 4:
+        show_frame(f'instruction_{current_instruction_page}')
 
 def start_training():
     """Start training session with tutorial"""
     global trial_index, block_index
     trial_index = 0
     block_index = 0
-    show_frame(frame_experiment)
-    stimulus_label.config(text="Starting tutorial...", fg="white")
+    stop_speech()
+    show_frame('experiment')
+    stimulus.warm_up()
+    stimulus.show_text("Starting tutorial...")
     instruction_label.config(text="")
     feedback_label.config(text="")
     root.update_idletasks()
@@ -731,24 +858,87 @@ def skip_training():
         messagebox.showwarning("Training Required", "Training is mandatory for first-time participants")
         return
         
+    stop_speech()
     prepare_blocks()
-    show_frame(frame_experiment)
+    show_frame('experiment')
     start_block()
 
+def offer_resume():
+    """Offer to continue an interrupted session for this participant and version.
+
+    Returns True if the session was resumed.
+    """
+    global block_index, trial_index, journal, session_segment, experiment_data, session_started
+    records = find_unfinished(journal_path())
+    if not records:
+        return False
+    
+    trials = [r for r in records if r['type'] == TRIAL]
+    prepare_blocks()  # Deterministic: same blocks as the interrupted run
+    total = sum(len(block['trials']) for block in experiment_blocks)
+    if not messagebox.askyesno(
+            "Resume Session",
+            f"An unfinished session was found for participant {participant_id} (visit {current_version}) "
+            f"with {len(trials)} of {total} trials completed.\n\nResume from where it stopped?"):
+        return False
+    
+    # Continue right after the last completed trial
+    last = trials[-1]
+    block_index, trial_index = last['block_index'], last['trial_index'] + 1
+    if trial_index >= len(experiment_blocks[block_index]['trials']):
+        block_index, trial_index = block_index + 1, 0
+    
+    session_segment = sum(1 for r in records if r['type'] == RESUME) + 1
+    session_started = records[0].get('started')  # The SESSION header: same session, same collector identity
+    journal = resume_journal(journal_path(), JOURNAL_FLUSH_EVERY,
+                             segment=session_segment,
+                             block_index=block_index, trial_index=trial_index,
+                             anchor_wall_ns=session_clock.anchor_wall_ns,
+                             resumed=session_clock.to_timestamp(session_clock.now()))
+    experiment_data = TrialStore.from_records(trials, participant_id, current_version, LETTERS)
+    
+    # A crash after a block's last trial but before its summary was journaled leaves it without one
+    summarized = {r['block_index'] for r in records if r['type'] == BLOCK}
+    stats = SessionStats.from_store(experiment_data)
+    for b in range(block_index):
+        if b not in summarized and stats.block(b) is not None:
+            journal.append(BLOCK, **stats.block(b).summary())
+            if DEBUG:
+                print(f"Rebuilt the summary of block {b} from its journaled trials")
+    journal.flush()
+    if DEBUG:
+        print(f"Resuming at block {block_index}, trial {trial_index} (segment {session_segment})")
+    
+    show_frame('experiment')
+    if block_index < len(experiment_blocks):
+        start_block(resumed=True)
+    else:
+        end_experiment()  # Every trial was recorded; only the completion marker is missing
+    return True
+
 def start_actual_experiment():
     """Start the main experiment"""
     prepare_blocks()
-    show_frame(frame_experiment)
+    show_frame('experiment')
     start_block()
 
 def confirm_exit():
     """Confirm before exiting the application"""
     if messagebox.askyesno("Quit", "Are you sure you want to exit?"):
-        if engine:
-            try:
-                engine.stop()
-            except Exception:
-                pass
+        if scheduler:
+            scheduler.cancel_all()
+        if journal:
+            journal.close()  # Keep every completed trial on disk
+        narrator.shutdown()
+        if collector:
+            collector.close()  # Brief last attempt; everything is in the journal regardless
+        if io_bridge:
+            io_bridge.shutdown()
+        if persistence:
+            if persistence.pending():
+                root.config(cursor='watch')
+                root.update_idletasks()
+            persistence.close()  # Waits for queued saves (with their retries); nothing is dropped
         root.destroy()
 
 # --- UI Setup ---
@@ -758,6 +948,11 @@ root.attributes('-fullscreen', True)
 root.configure(bg="#2d2d2d")
 root.protocol("WM_DELETE_WINDOW", confirm_exit)
 root.bind('<Escape>', lambda e: root.attributes('-fullscreen', False))
+root.bind('<F9>', lambda e: overlay_label is not None and toggle_overlay())
+for sequence in ('<KeyPress>', '<KeyRelease>', '<ButtonPress>', '<Motion>'):
+    root.bind_all(sequence, calibrate_event_clock, add='+')
+
+startup.mark("tk_init")
 
 # Configure ttk styles
 style = ttk.Style()
@@ -783,276 +978,355 @@ style.configure('TEntry',
                 insertcolor="#ffffff",
                 font=('Helvetica', 18),
                 borderwidth=2)
+startup.mark("ttk_style")
 
 # --- Frames ---
-frame_csv_login = ttk.Frame(root)
-frame_pid_login = ttk.Frame(root)
-frame_experiment = ttk.Frame(root)
-frame_transition = ttk.Frame(root)
-frame_end = ttk.Frame(root)
-frame_instruction_1 = ttk.Frame(root)
-frame_instruction_2 = ttk.Frame(root)
-frame_instruction_3 = ttk.Frame(root)
-frame_instruction_4 = ttk.Frame(root)
+# Each screen is registered as a factory below and only built the first time it
+# is shown (or, with PREBUILD_FRAMES, while the login screen sits idle).
+screens = FrameStack(root)  # Every screen, stacked in one grid cell of the window
+frames = screens.frames  # name -> built ttk.Frame
+frame_factory = screens.factory  # Decorator registering a frame's builder
+focus_targets = {}  # name -> widget that gets keyboard focus when the frame is shown
+
+# Widgets created by the factories and used by the handlers above
+entry_first = entry_last = lbl_csv_error = None
+entry_pid = entry_version = None
+welcome_title = training_title = instruction_note = btn_skip = None
+instruction_label = stimulus = feedback_label = None  # stimulus is a GlyphRenderer
+overlay_label = None
+end_status_label = None
+save_status = ("Your data has been automatically saved!", False)  # (text, is_error) for the end screen
+overlay_visible = False
+btn_start_experiment = None
+
+def prebuild_frames(names):
+    """Build the given frames one per idle callback, so input is handled in between"""
+    names = [name for name in names if name not in frames]
+    # Never build widgets while trials are running
+    if not names or screens.current == 'experiment':
+        return
+    screens.get(names[0])
+    root.after_idle(lambda: prebuild_frames(names[1:]))
 
 # --- CSV Login Screen ---
-csv_container = ttk.Frame(frame_csv_login)
-csv_container.pack(expand=True, padx=30, pady=20)
+@frame_factory('csv_login')
+def build_csv_login(frame):
+    global entry_first, entry_last, lbl_csv_error
+    csv_container = ttk.Frame(frame)
+    csv_container.pack(expand=True, padx=30, pady=20)
 
-ttk.Label(csv_container, text="N-Back Experiment", style='Title.TLabel').pack(pady=20)
-ttk.Label(csv_container, text="Please enter your first and last name.").pack(pady=10)
+    ttk.Label(csv_container, text="N-Back Experiment", style='Title.TLabel').pack(pady=20)
+    ttk.Label(csv_container, text="Please enter your first and last name.").pack(pady=10)
 
-form_frame = ttk.Frame(csv_container)
-form_frame.pack(pady=8)
+    form_frame = ttk.Frame(csv_container)
+    form_frame.pack(pady=8)
 
-ttk.Label(form_frame, text="First Name:").grid(row=0, column=0, padx=10, pady=10, sticky='w')
-entry_first = ttk.Entry(form_frame, width=25, font=('Helvetica', 18))
-entry_first.grid(row=0, column=1, padx=10, pady=10, sticky='ew', ipady=8)
+    ttk.Label(form_frame, text="First Name:").grid(row=0, column=0, padx=10, pady=10, sticky='w')
+    entry_first = ttk.Entry(form_frame, width=25, font=('Helvetica', 18))
+    entry_first.grid(row=0, column=1, padx=10, pady=10, sticky='ew', ipady=8)
 
-ttk.Label(form_frame, text="Last Name:").grid(row=1, column=0, padx=10, pady=10, sticky='w')
-entry_last = ttk.Entry(form_frame, width=25, font=('Helvetica', 18))
-entry_last.grid(row=1, column=1, padx=10, pady=10, sticky='ew', ipady=8)
+    ttk.Label(form_frame, text="Last Name:").grid(row=1, column=0, padx=10, pady=10, sticky='w')
+    entry_last = ttk.Entry(form_frame, width=25, font=('Helvetica', 18))
+    entry_last.grid(row=1, column=1, padx=10, pady=10, sticky='ew', ipady=8)
 
-form_frame.columnconfigure(1, weight=1)
+    form_frame.columnconfigure(1, weight=1)
 
-entry_first.bind('<Tab>', on_tab_key)
-entry_last.bind('<Tab>', on_tab_key)
+    entry_first.bind('<Tab>', on_tab_key)
+    entry_last.bind('<Tab>', on_tab_key)
+    focus_targets['csv_login'] = entry_first
 
-lbl_csv_error = ttk.Label(csv_container, foreground="red")
-lbl_csv_error.pack(pady=10)
+    lbl_csv_error = ttk.Label(csv_container, foreground="red")
+    lbl_csv_error.pack(pady=10)
 
-btn_frame = ttk.Frame(csv_container)
-btn_frame.pack(pady=8)
+    btn_frame = ttk.Frame(csv_container)
+    btn_frame.pack(pady=8)
 
-ttk.Button(btn_frame, text="Start", 
-           command=safe_button_click(handle_csv_login)).pack(side='left', padx=10)
-ttk.Button(btn_frame, text="Login with pID", 
-           command=safe_button_click(lambda: show_frame(frame_pid_login))).pack(side='left', padx=10)
+    ttk.Button(btn_frame, text="Start", 
+               command=safe_button_click(handle_csv_login)).pack(side='left', padx=10)
+    ttk.Button(btn_frame, text="Login with pID", 
+               command=safe_button_click(lambda: show_frame('pid_login'))).pack(side='left', padx=10)
 
 # --- PID Login Screen ---
-pid_container = ttk.Frame(frame_pid_login)
-pid_container.pack(expand=True, padx=40, pady=40)
+@frame_factory('pid_login')
+def build_pid_login(frame):
+    global entry_pid, entry_version
+    pid_container = ttk.Frame(frame)
+    pid_container.pack(expand=True, padx=40, pady=40)
 
-ttk.Button(pid_container, text="← Back to Main Login", 
-           command=safe_button_click(lambda: show_frame(frame_csv_login))).pack(pady=10, anchor='w')
-ttk.Label(pid_container, text="Alternative Login", style='Title.TLabel').pack(pady=20)
+    ttk.Button(pid_container, text="← Back to Main Login", 
+               command=safe_button_click(lambda: show_frame('csv_login'))).pack(pady=10, anchor='w')
+    ttk.Label(pid_container, text="Alternative Login", style='Title.TLabel').pack(pady=20)
 
-# Updated instruction text for alternative login
-ttk.Label(pid_container, 
-          text="Enter your participant ID and which visit you are on:\n"
-               "(1 if this is your first time, 2-5 for subsequent sessions).",
-          style='Instruction.TLabel').pack(pady=10)
+    # Updated instruction text for alternative login
+    ttk.Label(pid_container, 
+              text="Enter your participant ID and which visit you are on:\n"
+                   f"(1 if this is your first time, 2-{NUM_VERSIONS} for subsequent sessions).",
+              style='Instruction.TLabel').pack(pady=10)
 
-pid_form = ttk.Frame(pid_container)
-pid_form.pack(pady=20)
+    pid_form = ttk.Frame(pid_container)
+    pid_form.pack(pady=20)
 
-ttk.Label(pid_form, text="Participant ID:").grid(row=0, column=0, padx=10, pady=10, sticky='w')
-entry_pid = ttk.Entry(pid_form, width=25, font=('Helvetica', 18))
-entry_pid.grid(row=0, column=1, padx=10, pady=10, sticky='ew', ipady=8)
+    ttk.Label(pid_form, text="Participant ID:").grid(row=0, column=0, padx=10, pady=10, sticky='w')
+    entry_pid = ttk.Entry(pid_form, width=25, font=('Helvetica', 18))
+    entry_pid.grid(row=0, column=1, padx=10, pady=10, sticky='ew', ipady=8)
 
-ttk.Label(pid_form, text="Visit Number (1-5):").grid(row=1, column=0, padx=10, pady=10, sticky='w')
-entry_version = ttk.Entry(pid_form, width=25, font=('Helvetica', 18))
-entry_version.grid(row=1, column=1, padx=10, pady=10, sticky='ew', ipady=8)
+    ttk.Label(pid_form, text=f"Visit Number (1-{NUM_VERSIONS}):").grid(row=1, column=0, padx=10, pady=10, sticky='w')
+    entry_version = ttk.Entry(pid_form, width=25, font=('Helvetica', 18))
+    entry_version.grid(row=1, column=1, padx=10, pady=10, sticky='ew', ipady=8)
 
-pid_form.columnconfigure(1, weight=1)
-entry_pid.bind('<Tab>', on_tab_key)
-entry_version.bind('<Tab>', on_tab_key)
+    pid_form.columnconfigure(1, weight=1)
+    entry_pid.bind('<Tab>', on_tab_key)
+    entry_version.bind('<Tab>', on_tab_key)
+    focus_targets['pid_login'] = entry_pid
 
-ttk.Button(pid_container, text="Start", 
-           command=safe_button_click(handle_pid_login)).pack(pady=20)
+    ttk.Button(pid_container, text="Start", 
+               command=safe_button_click(handle_pid_login)).pack(pady=20)
 
 # --- Instruction Frame 1: Welcome Screen ---
-inst_container_1 = ttk.Frame(frame_instruction_1)
-inst_container_1.pack(expand=True, padx=40, pady=40)
-
-welcome_title = ttk.Label(inst_container_1, style='Title.TLabel')
-welcome_title.pack(pady=10)
-
-ttk.Label(inst_container_1, 
-          text="In this task, letters will be presented on the screen one at a time. "
-               "\n\nPay attention to the letters, and if the letter on the screen is the same "
-               "as the one N times before, press the spacebar. \n\nClick the button to view examples and begin the tutorial.",
-          style='Instruction.TLabel').pack(pady=20, padx=20)
-
-nav_frame_1 = ttk.Frame(inst_container_1)
-nav_frame_1.pack(pady=30)
-ttk.Button(nav_frame_1, text="🔊 Replay Speech",
-           command=safe_button_click(replay_speech)).pack(side='left', padx=10)
-btn_next = ttk.Button(nav_frame_1, text="Next →", command=safe_button_click(next_instruction))
-btn_next.pack(side='right', padx=10)
+@frame_factory('instruction_1')
+def build_instruction_1(frame):
+    global welcome_title
+    inst_container_1 = ttk.Frame(frame)
+    inst_container_1.pack(expand=True, padx=40, pady=40)
+
+    welcome_title = ttk.Label(inst_container_1, style='Title.TLabel')
+    welcome_title.pack(pady=10)
+
+    ttk.Label(inst_container_1, 
+              text="In this task, letters will be presented on the screen one at a time. "
+                   "\n\nPay attention to the letters, and if the letter on the screen is the same "
+                   "as the one N times before, press the spacebar. \n\nClick the button to view examples and begin the tutorial.",
+              style='Instruction.TLabel').pack(pady=20, padx=20)
+
+    nav_frame_1 = ttk.Frame(inst_container_1)
+    nav_frame_1.pack(pady=30)
+    ttk.Button(nav_frame_1, text="🔊 Replay Speech",
+               command=safe_button_click(replay_speech)).pack(side='left', padx=10)
+    btn_next = ttk.Button(nav_frame_1, text="Next →", command=safe_button_click(next_instruction))
+    btn_next.pack(side='right', padx=10)
+    focus_targets['instruction_1'] = btn_next
+    update_instruction_titles()
 
 # --- Instruction Frame 2: 1-back Example ---
-inst_container_2 = ttk.Frame(frame_instruction_2)
-inst_container_2.pack(expand=True, padx=40, pady=40)
-
-ttk.Label(inst_container_2, text="1-back Example", style='Title.TLabel').pack(pady=20)
-ttk.Label(inst_container_2, 
-          text="Press SPACEBAR when the letter is the same as the previous letter:",
-          style='Instruction.TLabel').pack(pady=10)
-
-example_frame_2 = ttk.Frame(inst_container_2)
-example_frame_2.pack(pady=20)
-ttk.Label(example_frame_2, text="B", style='Example.TLabel').pack(side='left', padx=15)
-ttk.Label(example_frame_2, text="D", style='Example.TLabel').pack(side='left', padx=15)
-ttk.Label(example_frame_2, text="D", style='Example.TLabel', foreground="#ff9900").pack(side='left', padx=15)
-ttk.Label(example_frame_2, text="→ Press SPACE here", style='Instruction.TLabel').pack(side='left', padx=15)
-
-ttk.Label(inst_container_2, 
-          text="In this example, press SPACE on the third letter because it matches the previous letter.",
-          style='Instruction.TLabel').pack(pady=10)
-
-nav_frame_2 = ttk.Frame(inst_container_2)
-nav_frame_2.pack(pady=30)
-ttk.Button(nav_frame_2, text="🔊 Replay Speech",
-           command=safe_button_click(replay_speech)).pack(side='left', padx=10)
-ttk.Button(nav_frame_2, text="← Back", 
-           command=safe_button_click(prev_instruction)).pack(side='left', padx=10)
-ttk.Button(nav_frame_2, text="Next →", 
-           command=safe_button_click(next_instruction)).pack(side='right', padx=10)
+@frame_factory('instruction_2')
+def build_instruction_2(frame):
+    inst_container_2 = ttk.Frame(frame)
+    inst_container_2.pack(expand=True, padx=40, pady=40)
+
+    ttk.Label(inst_container_2, text="1-back Example", style='Title.TLabel').pack(pady=20)
+    ttk.Label(inst_container_2, 
+              text="Press SPACEBAR when the letter is the same as the previous letter:",
+              style='Instruction.TLabel').pack(pady=10)
+
+    example_frame_2 = ttk.Frame(inst_container_2)
+    example_frame_2.pack(pady=20)
+    ttk.Label(example_frame_2, text="B", style='Example.TLabel').pack(side='left', padx=15)
+    ttk.Label(example_frame_2, text="D", style='Example.TLabel').pack(side='left', padx=15)
+    ttk.Label(example_frame_2, text="D", style='Example.TLabel', foreground="#ff9900").pack(side='left', padx=15)
+    ttk.Label(example_frame_2, text="→ Press SPACE here", style='Instruction.TLabel').pack(side='left', padx=15)
+
+    ttk.Label(inst_container_2, 
+              text="In this example, press SPACE on the third letter because it matches the previous letter.",
+              style='Instruction.TLabel').pack(pady=10)
+
+    nav_frame_2 = ttk.Frame(inst_container_2)
+    nav_frame_2.pack(pady=30)
+    ttk.Button(nav_frame_2, text="🔊 Replay Speech",
+               command=safe_button_click(replay_speech)).pack(side='left', padx=10)
+    ttk.Button(nav_frame_2, text="← Back", 
+               command=safe_button_click(prev_instruction)).pack(side='left', padx=10)
+    btn_next = ttk.Button(nav_frame_2, text="Next →", 
+                          command=safe_button_click(next_instruction))
+    btn_next.pack(side='right', padx=10)
+    focus_targets['instruction_2'] = btn_next
 
 # --- Instruction Frame 3: 2-back Example ---
-inst_container_3 = ttk.Frame(frame_instruction_3)
-inst_container_3.pack(expand=True, padx=40, pady=40)
-
-ttk.Label(inst_container_3, text="2-back Example", style='Title.TLabel').pack(pady=20)
-ttk.Label(inst_container_3, 
-          text="Press SPACEBAR when the letter is the same as the letter shown two letters ago:",
-          style='Instruction.TLabel').pack(pady=10)
-
-example_frame_3 = ttk.Frame(inst_container_3)
-example_frame_3.pack(pady=20)
-ttk.Label(example_frame_3, text="B", style='Example.TLabel').pack(side='left', padx=15)
-ttk.Label(example_frame_3, text="D", style='Example.TLabel').pack(side='left', padx=15)
-ttk.Label(example_frame_3, text="B", style='Example.TLabel', foreground="#ff9900").pack(side='left', padx=15)
-ttk.Label(example_frame_3, text="→ Press SPACE here", style='Instruction.TLabel').pack(side='left', padx=15)
-
-ttk.Label(inst_container_3, 
-          text="In this example, press SPACE on the third letter (B) because it matches the letter two positions back.",
-          style='Instruction.TLabel').pack(pady=10)
-
-nav_frame_3 = ttk.Frame(inst_container_3)
-nav_frame_3.pack(pady=30)
-ttk.Button(nav_frame_3, text="🔊 Replay Speech",
-           command=safe_button_click(replay_speech)).pack(side='left', padx=10)
-ttk.Button(nav_frame_3, text="← Back", 
-           command=safe_button_click(prev_instruction)).pack(side='left', padx=10)
-ttk.Button(nav_frame_3, text="Next →", 
-           command=safe_button_click(next_instruction)).pack(side='right', padx=10)
+@frame_factory('instruction_3')
+def build_instruction_3(frame):
+    inst_container_3 = ttk.Frame(frame)
+    inst_container_3.pack(expand=True, padx=40, pady=40)
+
+    ttk.Label(inst_container_3, text="2-back Example", style='Title.TLabel').pack(pady=20)
+    ttk.Label(inst_container_3, 
+              text="Press SPACEBAR when the letter is the same as the letter shown two letters ago:",
+              style='Instruction.TLabel').pack(pady=10)
+
+    example_frame_3 = ttk.Frame(inst_container_3)
+    example_frame_3.pack(pady=20)
+    ttk.Label(example_frame_3, text="B", style='Example.TLabel').pack(side='left', padx=15)
+    ttk.Label(example_frame_3, text="D", style='Example.TLabel').pack(side='left', padx=15)
+    ttk.Label(example_frame_3, text="B", style='Example.TLabel', foreground="#ff9900").pack(side='left', padx=15)
+    ttk.Label(example_frame_3, text="→ Press SPACE here", style='Instruction.TLabel').pack(side='left', padx=15)
+
+    ttk.Label(inst_container_3, 
+              text="In this example, press SPACE on the third letter (B) because it matches the letter two positions back.",
+              style='Instruction.TLabel').pack(pady=10)
+
+    nav_frame_3 = ttk.Frame(inst_container_3)
+    nav_frame_3.pack(pady=30)
+    ttk.Button(nav_frame_3, text="🔊 Replay Speech",
+               command=safe_button_click(replay_speech)).pack(side='left', padx=10)
+    ttk.Button(nav_frame_3, text="← Back", 
+               command=safe_button_click(prev_instruction)).pack(side='left', padx=10)
+    btn_next = ttk.Button(nav_frame_3, text="Next →", 
+                          command=safe_button_click(next_instruction))
+    btn_next.pack(side='right', padx=10)
+    focus_targets['instruction_3'] = btn_next
 
 # --- Instruction Frame 4: Training Instructions ---
-inst_container_4 = ttk.Frame(frame_instruction_4)
-inst_container_4.pack(expand=True, padx=40, pady=40)
-
-training_title = ttk.Label(inst_container_4, style='Title.TLabel')
-training_title.pack(pady=20)
-
-ttk.Label(inst_container_4, 
-          text="For the tutorial, you will be doing 1-back and 2-back tasks to practice before the main experiment. "
-               "During the tutorial, you'll get immediate feedback on your responses.",
-          style='Instruction.TLabel').pack(pady=10, padx=20)
-
-ttk.Label(inst_container_4, 
-          text="The tutorial will show 6 trials for each task (1-back and 2-back) with a mix of targets and non-targets. "
-               "After each response, you'll see if you were correct and get an explanation.",
-          style='Instruction.TLabel').pack(pady=10, padx=20)
-
-ttk.Label(inst_container_4, 
-          text="Remember: Press SPACE only if the letter matches the one shown N positions back!",
-          style='Instruction.TLabel', foreground="#ff9900").pack(pady=10, padx=20)
-
-ttk.Label(inst_container_4, 
-          text="When you are ready, press 'Start Training' to begin. "
-               "If you are already familiar with the task, you can press 'Skip Training' to proceed directly to the main experiment.",
-          style='Instruction.TLabel').pack(pady=10, padx=20)
-
-instruction_note = ttk.Label(inst_container_4, 
-                             text="", 
-                             style='Instruction.TLabel',
-                             foreground="#ff9900")
-instruction_note.pack(pady=10, padx=20)
-
-btn_train_frame = ttk.Frame(inst_container_4)
-btn_train_frame.pack(pady=30)
-ttk.Button(btn_train_frame, text="🔊 Replay Speech",
-           command=safe_button_click(replay_speech)).pack(side='left', padx=10)
-ttk.Button(btn_train_frame, text="← Back", 
-           command=safe_button_click(prev_instruction)).pack(side='left', padx=10)
-btn_skip = ttk.Button(btn_train_frame, text="Skip Training", 
-                      command=safe_button_click(skip_training))
-btn_skip.pack(side='left', padx=10)
-ttk.Button(btn_train_frame, text="Start Training", 
-           command=safe_button_click(start_training)).pack(side='left', padx=10)
+@frame_factory('instruction_4')
+def build_instruction_4(frame):
+    global training_title, instruction_note, btn_skip
+    inst_container_4 = ttk.Frame(frame)
+    inst_container_4.pack(expand=True, padx=40, pady=40)
+
+    training_title = ttk.Label(inst_container_4, style='Title.TLabel')
+    training_title.pack(pady=20)
+
+    ttk.Label(inst_container_4, 
+              text="For the tutorial, you will be doing 1-back and 2-back tasks to practice before the main experiment. "
+                   "During the tutorial, you'll get immediate feedback on your responses.",
+              style='Instruction.TLabel').pack(pady=10, padx=20)
+
+    ttk.Label(inst_container_4, 
+              text="The tutorial will show 6 trials for each task (1-back and 2-back) with a mix of targets and non-targets. "
+                   "After each response, you'll see if you were correct and get an explanation.",
+              style='Instruction.TLabel').pack(pady=10, padx=20)
+
+    ttk.Label(inst_container_4, 
+              text="Remember: Press SPACE only if the letter matches the one shown N positions back!",
+              style='Instruction.TLabel', foreground="#ff9900").pack(pady=10, padx=20)
+
+    ttk.Label(inst_container_4, 
+              text="When you are ready, press 'Start Training' to begin. "
+                   "If you are already familiar with the task, you can press 'Skip Training' to proceed directly to the main experiment.",
+              style='Instruction.TLabel').pack(pady=10, padx=20)
+
+    instruction_note = ttk.Label(inst_container_4, 
+                                 text="", 
+                                 style='Instruction.TLabel',
+                                 foreground="#ff9900")
+    instruction_note.pack(pady=10, padx=20)
+
+    btn_train_frame = ttk.Frame(inst_container_4)
+    btn_train_frame.pack(pady=30)
+    ttk.Button(btn_train_frame, text="🔊 Replay Speech",
+               command=safe_button_click(replay_speech)).pack(side='left', padx=10)
+    ttk.Button(btn_train_frame, text="← Back", 
+               command=safe_button_click(prev_instruction)).pack(side='left', padx=10)
+    btn_skip = ttk.Button(btn_train_frame, text="Skip Training", 
+                          command=safe_button_click(skip_training))
+    btn_skip.pack(side='left', padx=10)
+    ttk.Button(btn_train_frame, text="Start Training", 
+               command=safe_button_click(start_training)).pack(side='left', padx=10)
+    update_instruction_titles()
+    update_instruction_buttons()
 
 # --- Experiment Frame ---
-experiment_container = ttk.Frame(frame_experiment)
-experiment_container.pack(expand=True, fill='both')
-
-# Add instruction label (only used in tutorial)
-instruction_label = ttk.Label(experiment_container, 
-                            text="", 
-                            font=("Helvetica", 35),
-                            foreground="#ffffff",
-                            background="#2d2d2d",
-                            anchor='center')
-instruction_label.pack(pady=20)
-
-stimulus_label = tk.Label(experiment_container, 
-                          text="", 
-                          font=("Helvetica", 144, "bold"),
-                          fg="#ffffff",
-                          bg="#2d2d2d")
-stimulus_label.pack(expand=True)
-
-# Add feedback label for tutorial
-feedback_label = ttk.Label(experiment_container, 
-                          text="", 
-                          font=("Helvetica", 35),
-                          foreground="#ffffff",
-                          background="#2d2d2d",
-                          anchor='center')
-feedback_label.pack(pady=20)
+@frame_factory('experiment')
+def build_experiment(frame):
+    global instruction_label, stimulus, feedback_label, overlay_label
+    experiment_container = ttk.Frame(frame)
+    experiment_container.pack(expand=True, fill='both')
+
+    # Add instruction label (only used in tutorial)
+    instruction_label = ttk.Label(experiment_container, 
+                                text="", 
+                                font=("Helvetica", 35),
+                                foreground="#ffffff",
+                                background="#2d2d2d",
+                                anchor='center')
+    instruction_label.pack(pady=20)
+
+    # Every letter (including the tutorial's) and the fixation dot is pre-rendered
+    tutorial_letters = [t['letter'] for block in get_tutorial_blocks() for t in block['trials']]
+    stimulus = GlyphRenderer(experiment_container, dict.fromkeys(LETTERS + tutorial_letters),
+                             bg="#2d2d2d", fg="#ffffff")
+    stimulus.pack(expand=True, fill='x')
+
+    # Add feedback label for tutorial
+    feedback_label = ttk.Label(experiment_container, 
+                              text="", 
+                              font=("Helvetica", 35),
+                              foreground="#ffffff",
+                              background="#2d2d2d",
+                              anchor='center')
+    feedback_label.pack(pady=20)
+
+    # Experimenter overlay: live block stats in the top-right corner, hidden unless enabled
+    overlay_label = ttk.Label(frame, text="", font=("Helvetica", 14),
+                              foreground="#aaaaaa", background="#2d2d2d")
+    if EXPERIMENTER_OVERLAY:
+        toggle_overlay()
 
 # --- Transition Frame ---
-transition_container = ttk.Frame(frame_transition)
-transition_container.pack(expand=True, padx=40, pady=40)
-
-ttk.Label(transition_container, text="Training Complete!", style='Title.TLabel').pack(pady=30)
-ttk.Label(transition_container,
-          text="Great job! You've finished the training phase.\n\n"
-               "Now you'll complete the actual experiment with the same tasks.\n"
-               "\nIt is important to note that in the actual experiment, you will not know if your answers are correct, and the stimuli will be much quicker.\n"
-               "\nRemember: Press SPACEBAR when the letter matches the one from N positions back.",
-          wraplength=600,
-          justify='center',
-          font=("Helvetica", 25)).pack(pady=30)
-
-# Create a frame for buttons to arrange them vertically
-button_container = ttk.Frame(transition_container)
-button_container.pack(pady=20)
-
-# Button to start experiment
-btn_start_experiment = ttk.Button(button_container, 
-                                 text="Start Experiment", 
-                                 command=safe_button_click(start_actual_experiment))
-btn_start_experiment.pack(pady=10)
-
-# Button to redo tutorial
-btn_redo_tutorial = ttk.Button(button_container, 
-                               text="Redo Tutorial", 
-                               command=safe_button_click(redo_tutorial))
-btn_redo_tutorial.pack(pady=10)
+@frame_factory('transition')
+def build_transition(frame):
+    global btn_start_experiment
+    transition_container = ttk.Frame(frame)
+    transition_container.pack(expand=True, padx=40, pady=40)
+
+    ttk.Label(transition_container, text="Training Complete!", style='Title.TLabel').pack(pady=30)
+    ttk.Label(transition_container,
+              text="Great job! You've finished the training phase.\n\n"
+                   "Now you'll complete the actual experiment with the same tasks.\n"
+                   "\nIt is important to note that in the actual experiment, you will not know if your answers are correct, and the stimuli will be much quicker.\n"
+                   "\nRemember: Press SPACEBAR when the letter matches the one from N positions back.",
+              wraplength=600,
+              justify='center',
+              font=("Helvetica", 25)).pack(pady=30)
+
+    # Create a frame for buttons to arrange them vertically
+    button_container = ttk.Frame(transition_container)
+    button_container.pack(pady=20)
+
+    # Button to start experiment
+    btn_start_experiment = ttk.Button(button_container, 
+                                     text="Start Experiment", 
+                                     command=safe_button_click(start_actual_experiment))
+    btn_start_experiment.pack(pady=10)
+    focus_targets['transition'] = btn_start_experiment
+
+    # Button to redo tutorial
+    btn_redo_tutorial = ttk.Button(button_container, 
+                                   text="Redo Tutorial", 
+                                   command=safe_button_click(redo_tutorial))
+    btn_redo_tutorial.pack(pady=10)
 
 # --- End Frame ---
-end_container = ttk.Frame(frame_end)
-end_container.pack(expand=True, padx=40, pady=40)
-
-ttk.Label(end_container, text="Thank you for your participation!", style='Title.TLabel').pack(pady=30)
-ttk.Label(end_container,
-          text=f"Your data has been automatically saved!",
-          wraplength=600,
-          justify='center',
-          font=("Helvetica", 16)).pack(pady=20)
+@frame_factory('end')
+def build_end(frame):
+    end_container = ttk.Frame(frame)
+    end_container.pack(expand=True, padx=40, pady=40)
+
+    ttk.Label(end_container, text="Thank you for your participation!", style='Title.TLabel').pack(pady=30)
+    global end_status_label
+    end_status_label = ttk.Label(end_container,
+              text=save_status[0],
+              wraplength=600,
+              justify='center',
+              font=("Helvetica", 16))
+    end_status_label.pack(pady=20)
+    if save_status[1]:
+        end_status_label.config(foreground="#ff6b6b")
 
 # --- Initialize ---
-show_frame(frame_csv_login)
+def on_first_paint(event):
+    """Close the startup profile once the login screen is on screen"""
+    root.unbind('<Map>')
+    root.update_idletasks()
+    startup.mark("first_paint")
+    summary = startup.report(STARTUP_BUDGET_MS, STARTUP_LOG)
+    if DEBUG:
+        print(summary)
+    start_io_bridge()
+    preload_roster()
+    preload_manifest()
+    if PREBUILD_FRAMES:
+        # Every registered screen, in registration order, which follows the flow of the session
+        root.after_idle(lambda: prebuild_frames(list(screens.factories)))
+
+root.bind('<Map>', on_first_paint)
+show_frame('csv_login')
+startup.mark("login_frame")
 root.mainloop()
\ No newline at end of file
@@ -0,0 +1,106 @@
+# nback_frames.py
+import time
+from tkinter import ttk
+
+
+class FrameStack:
+    """Screens stacked in one grid cell of the parent, switched in constant time.
+
+    Unpacking every screen and packing the next makes Tk lay out the whole
+    window on each switch, at a cost that grows with every screen added.
+    Here each frame is gridded into the same cell once, when it is built, and
+    show() grid_remove()s only the current frame and re-grids the next (grid
+    remembers its options), so a switch costs the same with 3 or 30 screens.
+    Hidden frames are unmapped rather than just covered (as tkraise() would
+    leave them), so Tab traversal and the space bar can never reach a button
+    on another screen.
+
+    Frames are built on first use by the factory registered under their name,
+    so adding a screen is one decorated function.
+    """
+
+    def __init__(self, parent, frame_class=ttk.Frame):
+        self.parent = parent
+        self.frame_class = frame_class
+        self.factories = {}  # name -> function that fills in a new frame
+        self.frames = {}  # name -> built frame
+        self.current = None
+        parent.grid_rowconfigure(0, weight=1)
+        parent.grid_columnconfigure(0, weight=1)
+
+    def factory(self, name):
+        """Register the decorated function as the builder of the named frame"""
+        def register(build):
+            self.factories[name] = build
+            return build
+        return register
+
+    def get(self, name):
+        """Return the named frame, building it (hidden) on first use"""
+        frame = self.frames.get(name)
+        if frame is None:
+            frame = self.frame_class(self.parent)
+            self.frames[name] = frame
+            self.factories[name](frame)
+            frame.grid(row=0, column=0, sticky='nsew')
+            frame.grid_remove()
+        return frame
+
+    def show(self, name):
+        """Hide the current frame and show the named one"""
+        frame = self.get(name)
+        if name != self.current:
+            if self.current is not None:
+                self.frames[self.current].grid_remove()
+            frame.grid()
+            self.current = name
+        return frame
+
+
+def benchmark_switch(parent, screens=9, widgets=12, switches=200):
+    """Screen switch latency in ms, including the resulting layout, for both methods.
+
+    Builds `screens` frames of `widgets` labels and buttons twice, once
+    switched the old way (pack_forget() every frame, pack the target) and once
+    with a FrameStack, and times `switches` switches of each up to the end of
+    update_idletasks(). Returns {"pack": [...], "stack": [...]}.
+    """
+    def fill(frame, i):
+        for j in range(widgets):
+            widget = ttk.Button if j % 3 == 2 else ttk.Label
+            widget(frame, text=f"Screen {i} widget {j}").pack(pady=2)
+
+    results = {}
+    old = ttk.Frame(parent)
+    old.pack(expand=True, fill='both')
+    frames = []
+    for i in range(screens):
+        frame = ttk.Frame(old)
+        fill(frame, i)
+        frames.append(frame)
+    times = []
+    for k in range(switches):
+        start = time.perf_counter_ns()
+        for frame in frames:
+            frame.pack_forget()
+        frames[k % screens].pack(expand=True, fill='both')
+        parent.update_idletasks()
+        times.append((time.perf_counter_ns() - start) / 1_000_000)
+    results["pack"] = times
+    old.destroy()
+
+    new = ttk.Frame(parent)
+    new.pack(expand=True, fill='both')
+    stack = FrameStack(new)
+    for i in range(screens):
+        stack.factory(i)(lambda frame, i=i: fill(frame, i))
+        stack.get(i)
+    times = []
+    for k in range(switches):
+        start = time.perf_counter_ns()
+        stack.show(k % screens)
+        parent.update_idletasks()
+        times.append((time.perf_counter_ns() - start) / 1_000_000)
+    results["stack"] = times
+    new.destroy()
+    return results
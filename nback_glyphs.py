@@ -0,0 +1,90 @@
+# nback_glyphs.py
+import tkinter as tk
+from tkinter import font as tkfont
+
+DOT = "•"  # Fixation dot shown between stimuli
+
+
+class GlyphRenderer:
+    """Stimulus area drawn on a Canvas with one pre-created text item per glyph.
+
+    Reconfiguring a Label's text and font on every trial makes Tk resolve the
+    font and redo the layout, and the first appearance of each letter pays for
+    rasterizing it. Here the fonts are named fonts created once, every letter
+    and the fixation dot is its own hidden canvas item, and showing a glyph
+    only hides the previous item and unhides the next. warm_up() draws every
+    item once (in the background colour) so no trial is the first to render
+    its letter. Banners and other messages go through one shared text item.
+    """
+
+    def __init__(self, parent, glyphs, bg="#2d2d2d", fg="#ffffff",
+                 family="Helvetica", size=144, dot_size=48):
+        self.bg = bg
+        self.fg = fg
+        self.stimulus_font = tkfont.Font(parent, family=family, size=size, weight="bold")
+        self.dot_font = tkfont.Font(parent, family=family, size=dot_size, weight="bold")
+        self.canvas = tk.Canvas(parent, bg=bg, highlightthickness=0,
+                                height=self.stimulus_font.metrics('linespace'))
+        self.items = {}
+        for glyph in list(glyphs) + [DOT]:
+            self._item(glyph)
+        self.text_item = self.canvas.create_text(0, 0, text="", font=self.stimulus_font,
+                                                 fill=fg, state='hidden')
+        self.current = None
+        self.canvas.bind('<Configure>', self._center)
+
+    def _item(self, glyph):
+        item = self.items.get(glyph)
+        if item is None:
+            font = self.dot_font if glyph == DOT else self.stimulus_font
+            width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+            item = self.items[glyph] = self.canvas.create_text(
+                width // 2, height // 2, text=glyph, font=font, fill=self.fg, state='hidden')
+        return item
+
+    def _center(self, event):
+        for item in self.canvas.find_all():
+            self.canvas.coords(item, event.width // 2, event.height // 2)
+
+    def _switch(self, item):
+        if item != self.current:
+            if self.current is not None:
+                self.canvas.itemconfigure(self.current, state='hidden')
+            self.canvas.itemconfigure(item, state='normal')
+            self.current = item
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def show(self, glyph, color=None):
+        """Show one glyph (a letter or DOT); glyphs not given up front are created on first use"""
+        item = self._item(str(glyph))
+        self.canvas.itemconfigure(item, fill=color or self.fg)
+        self._switch(item)
+
+    def show_text(self, text, color=None):
+        """Show a message (block banner etc.) in the stimulus font"""
+        self.canvas.itemconfigure(self.text_item, text=text, fill=color or self.fg)
+        self._switch(self.text_item)
+
+    def set_color(self, color):
+        """Recolour whatever is shown (tutorial feedback)"""
+        if self.current is not None:
+            self.canvas.itemconfigure(self.current, fill=color)
+
+    def clear(self):
+        if self.current is not None:
+            self.canvas.itemconfigure(self.current, state='hidden')
+            self.current = None
+
+    def warm_up(self):
+        """Render every glyph once, invisibly, so the first trials are not slower"""
+        shown = self.current
+        self.clear()
+        for item in self.items.values():
+            self.canvas.itemconfigure(item, fill=self.bg, state='normal')
+            self.canvas.update_idletasks()
+            self.canvas.itemconfigure(item, fill=self.fg, state='hidden')
+        if shown is not None:
+            self._switch(shown)
+        self.canvas.update_idletasks()